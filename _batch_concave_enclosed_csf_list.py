@@ -0,0 +1,288 @@
+import numpy as np
+
+from typing import Callable, List
+
+import _metrics
+import _scaling_functions
+import _terminator_classes
+import _utils
+
+
+class BatchConcaveEnclosedCSFList:
+    """
+    Enclosed curve shortening flow of many curves at once.
+
+    The vertices of every curve are held in one flat array, with the vertex count of each curve, and each stage of
+    the step is applied to the whole batch in a single vectorised operation.  The flow of each curve matches that of
+    ConcaveEnclosedCSFList with the same parameters.  Curves finish independently, when their own concavity falls
+    below the threshold or at max_iterations, and fail if a loop is detected or the curve collapses.  Finished and
+    failed curves are removed from the batch.
+
+    :param curves: List of Nx2 Numpy arrays, where N is the number of vertices in each curve.
+    :param step_size: Scales magnitude of each iteration.
+    :param step_sigma: Standard deviation for the Gaussian filter used on the step vector.
+    :param resample_sigma: Standard deviation for the Gaussian filter used during resampling.
+    :param scaling_function: Function type used for scaling the curvature magnitude vector.
+    :param max_iterations: Maximum iterations of each curve.
+    :param max_seconds: Maximum time for the whole batch.
+    :param concavity_threshold: Each curve finishes once its concavity is at or below the threshold.
+    :param save_interval: Iterations between saved curves.
+    """
+    def __init__(self, curves: List[np.ndarray],
+                 step_size: float = 1,
+                 step_sigma: float = 10,
+                 resample_sigma: float = 1,
+                 scaling_function: Callable = None,
+                 max_iterations: int = 10000,
+                 max_seconds: float = 100,
+                 concavity_threshold: float = 0.1,
+                 save_interval: int = 100):
+
+        self.initial_curves = [curve.astype(float) for curve in curves]
+        self.step_size = step_size
+        self.step_sigma = step_sigma
+        self.resample_sigma = resample_sigma
+        self.max_iterations = max_iterations
+        self.max_seconds = max_seconds
+        self.concavity_threshold = concavity_threshold
+        self.save_interval = save_interval
+
+        if scaling_function is None:
+            self.scaling_function = _scaling_functions.f_sigmoid(10, 0.1)
+        else:
+            self.scaling_function = scaling_function
+
+        self.resampling_factors = np.array([curve.shape[0] / _metrics.total_edge_length(curve)
+                                            for curve in self.initial_curves])
+        self.initial_areas = np.array([_metrics.enclosed_area(curve) for curve in self.initial_curves])
+
+        self.time_terminator = _terminator_classes.TimeECSFTerminator(self.max_seconds)
+
+        self.curves = [[] for _ in self.initial_curves]
+        self.lengths = [[] for _ in self.initial_curves]
+        self.final_curves = list(self.initial_curves)
+        self.iterations = np.zeros(len(self.initial_curves), dtype=int)
+        self.failed = np.zeros(len(self.initial_curves), dtype=bool)
+
+    def run(self):
+        self.time_terminator.start()
+
+        # Members of the batch still flowing, and their vertices.
+        active = np.arange(len(self.initial_curves))
+        vertices = np.concatenate(self.initial_curves) if self.initial_curves else np.empty((0, 2))
+        layout = _RaggedLayout(np.array([curve.shape[0] for curve in self.initial_curves], dtype=int))
+        intersecting = np.zeros(len(self.initial_curves), dtype=bool)
+
+        iteration = 0
+        state = _RaggedCurveState(vertices, layout)
+
+        while active.size:
+            self.time_terminator.next_step()
+
+            finished = (state.concavity <= self.concavity_threshold) | (iteration >= self.max_iterations)
+            if self.time_terminator.is_finished():
+                finished[:] = True
+            failed = ~finished & intersecting
+
+            if (finished | failed).any():
+                keep = ~(finished | failed)
+                self._finish(active, state, finished, failed)
+                active, intersecting = active[keep], intersecting[keep]
+                state = _RaggedCurveState(vertices[np.repeat(keep, layout.counts)], _RaggedLayout(layout.counts[keep]))
+                if not active.size:
+                    break
+
+            if not (iteration % self.save_interval):
+                intersecting = self._save(active, state)
+
+            vertices, layout, vanished = self._step(state, active)
+            iteration += 1
+
+            if vanished.any():
+                # Curves resampled to no vertices have collapsed, which fails them as it does the serial flow.
+                self._finish(active, state, np.zeros_like(vanished), vanished)
+                active, intersecting = active[~vanished], intersecting[~vanished]
+
+            state = _RaggedCurveState(vertices, layout)
+            self.iterations[active] = iteration
+
+    def _finish(self, active: np.ndarray, state: '_RaggedCurveState', finished: np.ndarray, failed: np.ndarray):
+        for i in np.flatnonzero(finished | failed):
+            self.final_curves[active[i]] = state.curve(i).copy()
+        self.failed[active[failed]] = True
+
+    def _save(self, active: np.ndarray, state: '_RaggedCurveState'):
+        # Save a copy of every active curve.  A curve longer than at its last save has looped.
+
+        intersecting = np.zeros(active.shape[0], dtype=bool)
+        for i, member in enumerate(active):
+            lengths = self.lengths[member]
+            lengths.append(state.total_lengths[i])
+            intersecting[i] = len(lengths) > 1 and lengths[-1] > lengths[-2]
+            self.curves[member].append(state.curve(i).copy())
+
+        return intersecting
+
+    def _step(self, state: '_RaggedCurveState', active: np.ndarray):
+        magnitude = self.scaling_function(state.normalised_curvature_positive_l1()) * self.step_size
+        step_vector = magnitude[:, None] * state.inward_normal
+        stepped_vertices = state.vertices + _ragged_gaussian_filter(step_vector, state.layout, self.step_sigma)
+
+        resampled, counts = _ragged_resample(stepped_vertices, state.layout, self.resampling_factors[active])
+
+        vanished = counts == 0
+        if vanished.any():
+            resampled, counts = resampled[np.repeat(~vanished, counts)], counts[~vanished]
+
+        layout = _RaggedLayout(counts)
+
+        return _ragged_gaussian_filter(resampled, layout, self.resample_sigma), layout, vanished
+
+    def get_n_curves(self, member: int, n: int):
+        curves = self.curves[member]
+
+        return [curves[i] for i in np.linspace(0, len(curves)-1, n, endpoint=True).astype(int)]
+
+    def last_to_first_curve_area_ratio(self, member: int):
+        return _metrics.enclosed_area(self.final_curves[member]) / self.initial_areas[member]
+
+
+class _RaggedLayout:
+    # Index arrays of a flat array of curves with the given vertex counts, shared by every stage that works on the
+    # same vertices.
+
+    def __init__(self, counts: np.ndarray):
+        self.counts = counts
+        self.starts = np.cumsum(counts) - counts
+        self.n_vertices = int(counts.sum())
+
+        ends = self.starts + counts - 1
+
+        # Periodic neighbours within each curve.
+        self.prev_index = np.arange(self.n_vertices) - 1
+        self.prev_index[self.starts] = ends
+        self.next_index = np.arange(self.n_vertices) + 1
+        self.next_index[ends] = self.starts
+
+        self._padded_indices = {}
+
+    def padded_indices(self, radius: int):
+        # Indices extending every curve by radius wrapped vertices on both sides, and the positions of the original
+        # vertices within the extended array.
+
+        if radius not in self._padded_indices:
+            padded_counts = self.counts + 2 * radius
+            padded_starts = np.cumsum(padded_counts) - padded_counts
+
+            local_index = np.arange(padded_counts.sum()) - np.repeat(padded_starts + radius, padded_counts)
+            local_index %= np.repeat(self.counts, padded_counts)
+            padded_index = local_index + np.repeat(self.starts, padded_counts)
+
+            interior_index = np.arange(self.n_vertices) + np.repeat(padded_starts + radius - self.starts, self.counts)
+
+            self._padded_indices[radius] = padded_index, interior_index
+
+        return self._padded_indices[radius]
+
+    def curve(self, vertices: np.ndarray, i: int):
+        return vertices[self.starts[i]:self.starts[i] + self.counts[i]]
+
+
+class _RaggedCurveState:
+    # Geometry of every curve of a batch, as CurveState, from the flat array of vertices and their layout.
+
+    def __init__(self, vertices: np.ndarray, layout: _RaggedLayout):
+        self.vertices = vertices
+        self.layout = layout
+
+        difference = vertices - np.take(vertices, layout.prev_index, axis=0)
+        self.edge_lengths = np.sqrt(difference[:, 0] ** 2 + difference[:, 1] ** 2)
+        self.total_lengths = _segment_sums(self.edge_lengths, layout)
+
+        edge = np.where(self.edge_lengths == 0, 10e-5, self.edge_lengths)
+        tangent = difference / edge[:, None]
+
+        second_diff_edge = np.take(self.edge_lengths, layout.next_index) + self.edge_lengths
+        second_diff_edge[second_diff_edge == 0] = 10e-5
+        normal = 2 * (np.take(tangent, layout.next_index, axis=0) - tangent) / second_diff_edge[:, None]
+
+        self.inward_normal = np.column_stack((tangent[:, 1], -tangent[:, 0]))
+
+        self.curvature = ((tangent[:, 1] * normal[:, 0] - normal[:, 1] * tangent[:, 0])
+                          / ((tangent[:, 1] ** 2 + tangent[:, 0] ** 2) ** (3 / 2)))
+
+        self.concavity = -_segment_sums(np.fmin(self.curvature, 0), layout)
+
+    def normalised_curvature_positive_l1(self):
+        # Scale the curvature of each curve such that its maximum positive curvature is one.
+
+        if not self.layout.n_vertices:
+            return self.curvature
+
+        norm = np.maximum.reduceat(self.curvature, self.layout.starts)
+
+        return self.curvature / np.repeat(np.where(norm > 0, norm, 1), self.layout.counts)
+
+    def curve(self, i: int):
+        return self.layout.curve(self.vertices, i)
+
+
+def _segment_sums(values: np.ndarray, layout: _RaggedLayout):
+    return np.add.reduceat(values, layout.starts) if layout.n_vertices else np.zeros(0)
+
+
+def _ragged_gaussian_filter(values: np.ndarray, layout: _RaggedLayout, sigma: float):
+    # Periodic Gaussian filter of each curve of a flat array of curves.
+    # Every curve is extended by the kernel radius on both sides with its own wrapped vertices, so that a single
+    # filter over the whole array gives each curve the same result as a wrap-mode filter of the curve alone.
+
+    from scipy import ndimage
+
+    padded_index, interior_index = layout.padded_indices(int(_utils.GAUSSIAN_TRUNCATE * sigma + 0.5))
+
+    filtered = ndimage.gaussian_filter1d(np.take(values, padded_index, axis=0), sigma, axis=0, mode='nearest',
+                                         truncate=_utils.GAUSSIAN_TRUNCATE)
+
+    return np.take(filtered, interior_index, axis=0)
+
+
+def _ragged_resample(vertices: np.ndarray, layout: _RaggedLayout, factors: np.ndarray):
+    # _utils.resample of each curve of a flat array of curves.
+    # The cumulative edge lengths of all curves form one increasing sequence, in which curve i spans
+    # cumulative_lengths[starts[i]:starts[i] + counts[i] + 1], so one search places every new vertex.
+
+    starts = layout.starts
+    ends = starts + layout.counts
+
+    difference = vertices - np.take(vertices, layout.prev_index, axis=0)
+    edge_lengths = np.sqrt(difference[:, 0] ** 2 + difference[:, 1] ** 2)
+
+    cumulative_lengths = np.zeros(layout.n_vertices + 1)
+    np.cumsum(edge_lengths, out=cumulative_lengths[1:])
+
+    total_lengths = cumulative_lengths[ends] - cumulative_lengths[starts]
+    new_counts = (factors * total_lengths).astype(int)
+    new_starts = np.cumsum(new_counts) - new_counts
+
+    spacing = total_lengths / np.maximum(new_counts, 1)
+    new_lengths = ((np.arange(new_counts.sum()) - np.repeat(new_starts, new_counts))
+                   * np.repeat(spacing, new_counts))
+
+    segment_start = np.repeat(cumulative_lengths[starts], new_counts)
+    segment_ends = np.repeat(ends, new_counts)
+
+    hi = np.searchsorted(cumulative_lengths, segment_start + new_lengths)
+    np.clip(hi, np.repeat(starts + 1, new_counts), segment_ends, out=hi)
+    lo = hi - 1
+
+    x_lo = np.take(cumulative_lengths, lo) - segment_start
+    x_hi = np.take(cumulative_lengths, hi) - segment_start
+    y_lo = np.take(vertices, lo, axis=0)
+    # The end of each curve's span is its first vertex, closing the loop.
+    closing = hi == segment_ends
+    hi[closing] -= np.repeat(layout.counts, new_counts)[closing]
+    y_hi = np.take(vertices, hi, axis=0)
+
+    slope = (y_hi - y_lo) / (x_hi - x_lo)[:, None]
+
+    return slope * (new_lengths - x_lo)[:, None] + y_lo, new_counts
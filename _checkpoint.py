@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+from typing import List
+
+import _curve_array
+
+
+class ECSFCheckpoint:
+    """
+    Snapshot of a ConcaveEnclosedCSFList run, from which the flow can be resumed with run(checkpoint).
+
+    :param iteration: Iterations completed when the checkpoint was taken.
+    :param step_size: Step size of the run when the checkpoint was taken.
+    :param resampling_factor: Vertices per unit length to which the curve was resampled when the checkpoint was taken.
+    :param curve: Nx2 Numpy array of the current curve.
+    :param curves: Curves saved so far.
+    :param lengths: Lengths of the curves saved so far.
+    :param stored_area_bins: Area bins of the curves saved so far, when the number of stored curves is bounded.
+    :param crossing_points: Crossings of the current curve, when intersections are checked.
+    :param elapsed_seconds: Running time of the flow when the checkpoint was taken.
+    """
+    def __init__(self, iteration: int, step_size: float, resampling_factor: float, curve: np.ndarray,
+                 curves: List[np.ndarray], lengths: List[float], stored_area_bins: List[int],
+                 crossing_points: np.ndarray, elapsed_seconds: float):
+        self.iteration = iteration
+        self.step_size = step_size
+        self.resampling_factor = resampling_factor
+        self.curve = curve
+        self.curves = curves
+        self.lengths = lengths
+        self.stored_area_bins = stored_area_bins
+        self.crossing_points = crossing_points
+        self.elapsed_seconds = elapsed_seconds
+
+    def save(self, filename: str):
+        # Write to a temporary file first, so that an interrupted save leaves the previous checkpoint intact.
+
+        curves = _curve_array.from_curves(self.curves)
+        temporary_filename = filename + '.tmp'
+
+        with open(temporary_filename, 'wb') as file:
+            np.savez(file,
+                     iteration=self.iteration,
+                     step_size=self.step_size,
+                     resampling_factor=self.resampling_factor,
+                     curve=self.curve,
+                     curve_vertices=curves.vertices,
+                     curve_offsets=curves.offsets,
+                     lengths=np.asarray(self.lengths, dtype=float),
+                     stored_area_bins=np.asarray(self.stored_area_bins, dtype=int),
+                     crossing_points=self.crossing_points.reshape(-1, 2),
+                     elapsed_seconds=self.elapsed_seconds)
+
+        os.replace(temporary_filename, filename)
+
+
+def load(filename: str):
+    with np.load(filename) as data:
+        return ECSFCheckpoint(int(data['iteration']),
+                              float(data['step_size']),
+                              float(data['resampling_factor']),
+                              data['curve'],
+                              _curve_array.CurveArray(data['curve_vertices'], data['curve_offsets']).to_list(),
+                              data['lengths'].tolist(),
+                              data['stored_area_bins'].tolist(),
+                              data['crossing_points'],
+                              float(data['elapsed_seconds']))
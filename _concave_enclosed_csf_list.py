@@ -1,15 +1,26 @@
+import time
+
 import numpy as np
 
-from typing import Callable
+from typing import Callable, Sequence
 
+import _checkpoint
+import _curve_array
+import _curve_state
+import _intersection
 import _scaling_functions
+import _step_controller_classes
 import _metrics
-import _vector_maths
 import _utils
+import _workspace
 import _refresher_classes
+import _resampler_classes
 import _saver_classes
 import _terminator_classes
 
+# Distance, in edge lengths, that a crossing may move between checks and still be taken as the same crossing.
+INTERSECTION_TRACKING_DISTANCE = 10
+
 
 class ConcaveEnclosedCSFList:
     """
@@ -20,6 +31,26 @@ class ConcaveEnclosedCSFList:
     :param step_sigma: Standard deviation for the Gaussian filter used on the step vector.
     :param curve: Nx2 Numpy array, where N is the number of vertices in the curve.
     :param step_size: Scales magnitude of each iteration.
+    :param max_stored_curves: If given, bound memory by storing only the first saved curve to reach each of
+    max_stored_curves equally-spaced fractions of the initial area, plus the latest saved curve.
+    :param save_area_fractions: If given, save a curve each time the enclosed area falls to one of these fractions of
+    the initial area, instead of every save_interval iterations.
+    :param intersection_check_interval: If given, check for crossing edges every intersection_check_interval
+    iterations, and fail as soon as edges cross away from any crossing found at the previous check, rather than
+    waiting for the length to grow between saves.
+    :param cancel_event: If given, the flow stops at the next iteration after this threading.Event, or
+    multiprocessing.Event, is set.
+    :param checkpoint_interval: If given, take a checkpoint at a save point at least every checkpoint_interval
+    iterations.  A checkpoint becomes self.checkpoint, the last good checkpoint, once the next save point passes the
+    loop checks, and the flow can be resumed from it with run(checkpoint).
+    :param step_controller: If given, chooses the step size of each iteration in place of step_size, from the
+    displacement of the curve at unit step size.  The step sizes taken are kept by the controller.
+    :param resampler: Decides at each step whether to resample the curve.  Defaults to resampling every step.  A
+    skipped resample still applies its Gaussian filter.  The resampler counts the steps resampled and skipped.
+    :param checkpoint_file: If given, also write each good checkpoint to this file, to be read with
+    _checkpoint.load().
+    :param backend: 'numpy' or 'numba', the backend computing the geometry of the curve at each step.  Defaults to
+    _curve_state.BACKEND.
     :return:
     """
     def __init__(self, curve: np.ndarray,
@@ -32,7 +63,16 @@ class ConcaveEnclosedCSFList:
                  max_seconds: float = 100,
                  concavity_threshold: float = 0.1,
                  refresh_interval: int = 100,
-                 save_interval: int = 100):
+                 save_interval: int = 100,
+                 max_stored_curves: int = None,
+                 save_area_fractions: Sequence[float] = None,
+                 intersection_check_interval: int = None,
+                 cancel_event=None,
+                 checkpoint_interval: int = None,
+                 checkpoint_file: str = None,
+                 step_controller: _step_controller_classes.StepControllerInterface = None,
+                 resampler: _resampler_classes.ResamplerInterface = None,
+                 backend: str = None):
 
         curve = curve.astype(float)
 
@@ -48,6 +88,18 @@ class ConcaveEnclosedCSFList:
         self.concavity_threshold = concavity_threshold
         self.refresh_interval = refresh_interval
         self.save_interval = save_interval
+        self.max_stored_curves = max_stored_curves
+        self.save_area_fractions = save_area_fractions
+        self.intersection_check_interval = intersection_check_interval
+        self.cancel_event = cancel_event
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_file = checkpoint_file
+        self.step_controller = step_controller
+        self.backend = backend
+        self.checkpoint = None
+        self._pending_checkpoint = None
+        self._crossing_points = np.empty((0, 2))
+        self._stored_area_bins = []
 
         if scaling_function is None:
             self.scaling_function = _scaling_functions.f_sigmoid(10, 0.1)
@@ -62,21 +114,40 @@ class ConcaveEnclosedCSFList:
         self.lengths = [_metrics.total_edge_length(curve)]
 
         self.refresher = self._set_refresher()
+        self.resampler = self._set_resampler(resampler)
         self.saver = self._set_saver()
         self.iterative_terminator = self._set_iterative_terminator()
         self.time_terminator = self._set_time_terminator()
         self.conditional_terminator = self._set_conditional_terminator()
+        self.event_terminator = self._set_event_terminator()
 
         self.intersecting_curve_flag = False
 
+        # Every stage of every step is written into one workspace.  Resampling keeps the vertex count at or below that
+        # of the initial curve while the curve shortens, so its arrays are only allocated once.
+        self.workspace = _workspace.ECSFWorkspace(curve.shape[0] + 1)
+
         self.curr_curve = curve
+        self.curr_state = _curve_state.CurveState(curve, self.workspace, backend)
 
     def _set_refresher(self):
         return _refresher_classes.IterativeECSFRefresher(self.refresh_interval)
 
+    def _set_resampler(self, resampler: _resampler_classes.ResamplerInterface = None):
+        if resampler is None:
+            return _resampler_classes.IterativeECSFResampler(1)
+
+        return resampler
+
     def _set_saver(self):
+        if self.save_area_fractions is not None:
+            return _saver_classes.AreaECSFSaver(self.initial_area * np.asarray(self.save_area_fractions, dtype=float))
+
         return _saver_classes.IterativeECSFSaver(self.save_interval)
 
+    def _saved_curves(self):
+        return self.saver.saved_curves(self.curr_state)
+
     def _set_iterative_terminator(self):
         return _terminator_classes.IterativeECSFTerminator(self.max_iterations)
 
@@ -86,39 +157,68 @@ class ConcaveEnclosedCSFList:
     def _set_conditional_terminator(self):
         return _terminator_classes.ConditionalECSFTerminator(self.concavity_threshold)
 
+    def _set_event_terminator(self):
+        return _terminator_classes.EventECSFTerminator(self.cancel_event)
+
     def _curr_curve_area_percent_of_original(self):
         return 100 * _metrics.enclosed_area(self.curr_curve) / self.initial_area
 
     def _curr_curve_length_percent_of_original(self):
-        return 100 * _metrics.total_edge_length(self.curr_curve) / self.initial_length
+        return 100 * self.curr_state.total_length / self.initial_length
+
+    def _update_state(self, workspace: _workspace.ECSFWorkspace = None):
+        # Geometry of the current curve is computed once per step and shared by the step vector, refresher, saver
+        # and terminators.
+
+        self.curr_state = _curve_state.CurveState(self.curr_curve, workspace, self.backend)
 
     def _is_time_to_resample(self):
-        return True
+        return self.resampler.is_time_to_resample()
 
     def _resample(self):
         self.curr_curve = _utils.resample(self.curr_curve, self.resampling_factor)
 
-    def _filtered_resample(self):
-        self.curr_curve = _utils.gaussian_filter(_utils.resample(self.curr_curve, self.resampling_factor),
-                                                 self.resample_sigma)
+    def _filtered_resample(self, workspace: _workspace.ECSFWorkspace):
+        resampled = _utils.resample(self.curr_curve, self.resampling_factor, workspace=workspace)
+
+        self.curr_curve = _utils.gaussian_filter(resampled, self.resample_sigma,
+                                                 workspace.array('curve', resampled.shape[0], 2))
+
+    def _filter(self, workspace: _workspace.ECSFWorkspace):
+        # Smooth the curve as the resample does, on its current vertices.
+
+        self.curr_curve = _utils.gaussian_filter(self.curr_curve, self.resample_sigma,
+                                                 workspace.array('curve', self.curr_curve.shape[0], 2))
+
+    def _filtered_step_vector(self, workspace: _workspace.ECSFWorkspace):
+        output = workspace.array('filtered_step_vector', self.curr_curve.shape[0], 2)
 
-    def _filtered_step_vector(self):
-        return _utils.gaussian_filter(self._step_vector(), self.step_sigma)
+        if self.step_controller is None:
+            return _utils.gaussian_filter(self._step_vector(workspace, self.step_size), self.step_sigma, output)
 
-    def _step_vector(self):
-        return self.step_size * self._magnitude_array()[:, None] * self._vector_array()
+        # The filter is linear, so the step at unit step size is scaled by the step size the controller chooses.
+        filtered_step_vector = _utils.gaussian_filter(self._step_vector(workspace, 1), self.step_sigma, output)
+
+        return np.multiply(filtered_step_vector, self.step_controller.next_step(self.curr_state, filtered_step_vector),
+                           out=filtered_step_vector)
+
+    def _step_vector(self, workspace: _workspace.ECSFWorkspace, step_size: float):
+        n = self.curr_curve.shape[0]
+        magnitude = np.multiply(self._magnitude_array(), step_size, out=workspace.array('magnitude', n))
+
+        return np.multiply(magnitude[:, None], self._vector_array(), out=workspace.array('step_vector', n, 2))
 
     def _magnitude_array(self):
         # Magnitudes of iteration for each vertex.
         # Calculated as a scaled version of the normalised curvature.
 
-        return self.scaling_function(_metrics.normalised_curvature_positive_l1(self.curr_curve))
+        return self.scaling_function(self.curr_state.normalised_curvature_positive_l1())
 
     def _vector_array(self):
         # Vectors of iteration for each vertex.
         # Calculated as parallel to the normal and facing inward.
 
-        return _vector_maths.inward_normal(self.curr_curve)
+        return self.curr_state.inward_normal
 
     def _initial_vertex_count(self):
         return self.curves[0].shape[1]
@@ -126,60 +226,198 @@ class ConcaveEnclosedCSFList:
     def _initial_edge_length(self):
         return _metrics.total_edge_length(self.curves[0])
 
+    def _start_curve(self):
+        return self.initial_curve
+
     def _initialise(self):
         self.refresher.start()
-        self.saver.start()
         self.iterative_terminator.start()
         self.time_terminator.start()
-        self.conditional_terminator.start(_metrics.concavity(self.curr_curve))
+        self.event_terminator.start()
+        if self.step_controller is not None:
+            self.step_controller.start()
         self.intersecting_curve_flag = False
 
-        self.curr_curve = self.initial_curve
+        self.curr_curve = self._start_curve()
+        self._update_state(self.workspace)
+        self.saver.start(self.curr_state)
+        self.resampler.start(self.curr_state, self.resampling_factor)
+        if self.intersection_check_interval is not None:
+            self._crossing_points = self._find_crossing_points()
+        self.conditional_terminator.start(self.curr_state.concavity)
 
         self.curves = []
         self.lengths = []
+        self._stored_area_bins = []
+
+        self.checkpoint = None
+        self._pending_checkpoint = None
+
+    def _restore(self, checkpoint: _checkpoint.ECSFCheckpoint):
+        # Continue the flow from a checkpoint, at the current step size.
+
+        self.curr_curve = np.array(checkpoint.curve, dtype=float)
+        self._update_state(self.workspace)
+
+        self.refresher.curr_interation = checkpoint.iteration
+        self.iterative_terminator.curr_iterations = checkpoint.iteration
+        self.time_terminator.start_time -= checkpoint.elapsed_seconds
+        self.conditional_terminator.start(self.curr_state.concavity)
+        self._crossing_points = checkpoint.crossing_points
+
+        self.curves = list(checkpoint.curves)
+        self.lengths = list(checkpoint.lengths)
+        self._stored_area_bins = list(checkpoint.stored_area_bins)
+
+        self.saver.resume(self.curr_state, checkpoint.iteration, len(self.lengths))
+        self.resampler.resume(self.curr_state, self.resampling_factor, checkpoint.iteration)
+
+        self.checkpoint = checkpoint
+
+    def _take_checkpoint(self):
+        return _checkpoint.ECSFCheckpoint(self.iterative_terminator.curr_iterations,
+                                          self.step_size,
+                                          self.resampling_factor,
+                                          self.curr_curve.copy(),
+                                          list(self.curves),
+                                          list(self.lengths),
+                                          list(self._stored_area_bins),
+                                          self._crossing_points.copy(),
+                                          time.time() - self.time_terminator.start_time)
+
+    def _is_time_to_checkpoint(self):
+        if self.checkpoint_interval is None:
+            return False
+
+        last_checkpoint = self._pending_checkpoint or self.checkpoint
+        last_iteration = -self.checkpoint_interval if last_checkpoint is None else last_checkpoint.iteration
+
+        return self.iterative_terminator.curr_iterations - last_iteration >= self.checkpoint_interval
+
+    def _confirm_checkpoint(self, checkpoint: _checkpoint.ECSFCheckpoint):
+        # The pending checkpoint is good once a later save point has passed the loop checks.
+
+        if self._pending_checkpoint is not None:
+            self.checkpoint = self._pending_checkpoint
+            if self.checkpoint_file is not None:
+                self.checkpoint.save(self.checkpoint_file)
+
+        if checkpoint is not None:
+            self._pending_checkpoint = checkpoint
 
     def _step(self):
+        workspace = self.workspace
 
-        curve_new = self.curr_curve + self._filtered_step_vector()
+        curve_new = np.add(self.curr_curve, self._filtered_step_vector(workspace),
+                           out=workspace.array('stepped_curve', self.curr_curve.shape[0], 2))
 
         self.curr_curve = curve_new
 
         if self._is_time_to_resample():
-            self._filtered_resample()
+            self._filtered_resample(workspace)
+        else:
+            self._filter(workspace)
+
+        self._update_state(workspace)
 
         self.refresher.next_step()
-        self.saver.next_step()
+        self.resampler.next_step(self.curr_state)
+        self.saver.next_step(self.curr_state)
         self.iterative_terminator.next_step()
         self.time_terminator.next_step()
-        self.conditional_terminator.next_step(_metrics.concavity(self.curr_curve))
+        self.event_terminator.next_step()
+        self.conditional_terminator.next_step(self.curr_state.concavity)
+
+        if self._is_time_to_check_intersections():
+            self._check_intersections()
+
+    def _is_time_to_check_intersections(self):
+        return (self.intersection_check_interval is not None
+                and not self.iterative_terminator.curr_iterations % self.intersection_check_interval)
+
+    def _find_crossing_points(self):
+        return _intersection.crossing_points(self.curr_curve, _intersection.self_intersections(self.curr_curve))
+
+    def _check_intersections(self):
+        # Crossings already in the initial outline, such as pinch points of a traced image, persist as tiny loops
+        # that drift and split as the curve flows.  Only a crossing away from all previous crossings is a new loop.
+
+        crossing_points = self._find_crossing_points()
+
+        if crossing_points.shape[0]:
+            tolerance = INTERSECTION_TRACKING_DISTANCE / self.resampling_factor
+            distances = np.linalg.norm(crossing_points[:, None] - self._crossing_points[None], axis=2)
+            if not distances.shape[1] or np.any(distances.min(axis=1) > tolerance):
+                self.intersecting_curve_flag = True
 
-    def run(self):
+        self._crossing_points = crossing_points
+
+    def _store_curve(self, curve: np.ndarray, area: float):
+        # Keep every saved curve, or in bounded mode only the first to enter each area bin and the latest.
+
+        self.curves.append(curve)
+
+        if self.max_stored_curves is None:
+            return
+
+        self._stored_area_bins.append(int((1 - area / self.initial_area) * self.max_stored_curves))
+
+        # The previous curve was only kept as the latest if it did not reach a new area bin.
+        if len(self.curves) > 2 and self._stored_area_bins[-2] <= self._stored_area_bins[-3]:
+            del self.curves[-2]
+            del self._stored_area_bins[-2]
+
+    def run(self, checkpoint: _checkpoint.ECSFCheckpoint = None):
+        for _ in self.iter_run(checkpoint):
+            pass
+
+    def iter_run(self, checkpoint: _checkpoint.ECSFCheckpoint = None):
+        """
+        Runs the flow, yielding a SavedCurve at every save point as it is produced.
+
+        Curves are stored in self.curves as in run(), subject to max_stored_curves.
+
+        :param checkpoint: If given, resume the flow from this checkpoint instead of the initial curve.
+        """
         self._initialise()
+        if checkpoint is not None:
+            self._restore(checkpoint)
 
         while True:
             if (self.iterative_terminator.is_finished()
                     or self.time_terminator.is_finished()
-                    or self.conditional_terminator.is_finished()):
+                    or self.conditional_terminator.is_finished()
+                    or self.event_terminator.is_finished()):
                 break
 
             if self.intersecting_curve_flag:
                 raise Exception("Intersection in subset curve, try a smaller step size.")
 
             if self.refresher.is_time_to_refresh():
-                self.refresher.perform_refreshing(_metrics.concavity(self.curr_curve),
+                self.refresher.perform_refreshing(self.curr_state.concavity,
                                                   self._curr_curve_length_percent_of_original())
 
             if self.saver.is_time_to_save():
-                self.lengths.append(_metrics.total_edge_length(self.curr_curve))
-                if len(self.lengths) > 1 and self.lengths[-1] > self.lengths[-2]:
-                    self.intersecting_curve_flag = True
-                self.curves.append(self.curr_curve)
+                # A checkpoint is taken before saving, so that resuming from it repeats this save point.
+                checkpoint = self._take_checkpoint() if self._is_time_to_checkpoint() else None
+
+                for saved in self._saved_curves():
+                    self.lengths.append(saved.length)
+                    if len(self.lengths) > 1 and self.lengths[-1] > self.lengths[-2]:
+                        self.intersecting_curve_flag = True
+                    self._store_curve(saved.curve, saved.area)
+
+                    yield saved
+
+                if not self.intersecting_curve_flag:
+                    self._confirm_checkpoint(checkpoint)
 
             self._step()
 
-    def get_n_curves(self, n: int):
-        return [self.curves[i] for i in np.linspace(0, len(self.curves)-1, n, endpoint=True).astype(int)]
+    def get_n_curves(self, n: int, compact: bool = False):
+        n_curves = [self.curves[i] for i in np.linspace(0, len(self.curves)-1, n, endpoint=True).astype(int)]
+
+        return _curve_array.from_curves(n_curves) if compact else n_curves
 
     def last_to_first_curve_area_ratio(self):
         return _metrics.enclosed_area(self.curr_curve) / self.initial_area
@@ -1,5 +1,6 @@
 import numpy as np
 
+import _curve_array
 import _metrics
 import _vector_maths
 import _utils
@@ -33,10 +34,24 @@ class CSFList:
     def linspace_subsets_resample(self, n_subset: int):
         return [_utils.resample(curve, self.resampling_factor) for curve in self.linspace_subsets(n_subset)]
 
-    def mm_subset(self, n_subsets: int):
+    def mm_subset(self, n_subsets: int, batched: bool = True, stacked: bool = False, compact: bool = False):
+        # Curves smoothed at n_subsets scales.
+        # Batched computes every scale from one Fourier transform of the curve, otherwise each scale is filtered
+        # separately.  Stacked returns an n_subsetsxNx2 array and compact a CurveArray, instead of a list.
+
         linear_stds = self._linear_step_sigmas(n_subsets)
 
-        return [self._mokhtarian_mackworth92(sigma) for sigma in linear_stds]
+        if batched:
+            mm_curves = _utils.gaussian_scale_space(self.curve, linear_stds)
+        else:
+            mm_curves = np.stack([self._mokhtarian_mackworth92(sigma) for sigma in linear_stds])
+
+        if compact:
+            return _curve_array.from_stacked(mm_curves)
+        if stacked:
+            return mm_curves
+
+        return list(mm_curves)
 
     def _linear_step_sigmas(self, n_curves: int, startpoint=True):
         # Array of n_curve stds that will create linearly spaced curves.
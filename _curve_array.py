@@ -0,0 +1,119 @@
+import os
+import sys
+
+import numpy as np
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable
+
+
+class CurveArray:
+    """
+    Sequence of curves with varying vertex counts, stored as one contiguous block of vertices.
+
+    Curve i is vertices[offsets[i]:offsets[i + 1]].  Indexing returns views into the block, so a CurveArray can be
+    serialised, pickled or sent between processes as two arrays regardless of the number of curves.
+
+    :param vertices: Mx2 Numpy array of the vertices of every curve, one curve after another.
+    :param offsets: Numpy array of n+1 increasing indices into vertices, starting at 0 and ending at M.
+    """
+    def __init__(self, vertices: np.ndarray, offsets: np.ndarray):
+        offsets = np.asarray(offsets, dtype=np.intp)
+
+        if offsets.ndim != 1 or offsets.shape[0] == 0 or offsets[0] != 0 or offsets[-1] != vertices.shape[0]:
+            raise ValueError('Offsets must start at 0 and end at the number of vertices.')
+        if np.any(np.diff(offsets) < 0):
+            raise ValueError('Offsets must be non-decreasing.')
+
+        self.vertices = vertices
+        self.offsets = offsets
+
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return from_curves([self[i] for i in range(start, stop, step)])
+            stop = max(start, stop)
+            return CurveArray(self.vertices[self.offsets[start]:self.offsets[stop]],
+                              self.offsets[start:stop + 1] - self.offsets[start])
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('CurveArray index out of range.')
+
+        return self.vertices[self.offsets[item]:self.offsets[item + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def vertex_counts(self):
+        return np.diff(self.offsets)
+
+    def to_list(self):
+        # List of copies of each curve, detached from the shared block.
+
+        return [curve.copy() for curve in self]
+
+
+def from_curves(curves: Iterable[np.ndarray]):
+    # Copy a collection of Nx2 curves into a single CurveArray.
+
+    curves = [np.asarray(curve, dtype=float).reshape(-1, 2) for curve in curves]
+    offsets = np.zeros(len(curves) + 1, dtype=np.intp)
+    np.cumsum([curve.shape[0] for curve in curves], out=offsets[1:])
+
+    vertices = np.concatenate(curves) if curves else np.empty((0, 2))
+
+    return CurveArray(vertices, offsets)
+
+
+def from_stacked(curves: np.ndarray):
+    # View an nxNx2 array of curves with equal vertex counts as a CurveArray without copying.
+
+    n, n_vertices = curves.shape[:2]
+
+    return CurveArray(curves.reshape(n * n_vertices, 2), np.arange(n + 1) * n_vertices)
+
+
+def to_shared_memory(curves: CurveArray):
+    # Copy the vertices of a CurveArray into a new shared memory block, for another process to read with
+    # from_shared_memory.  Returns the name of the block and the offsets.
+    # The block is left for the reader to unlink, so it is not tracked by the creating process.
+
+    block = _untracked_shared_memory(max(curves.vertices.nbytes, 1))
+    np.ndarray(curves.vertices.shape, dtype=float, buffer=block.buf)[:] = curves.vertices
+    block.close()
+
+    return block.name, curves.offsets
+
+
+def _untracked_shared_memory(size: int):
+    # A new shared memory block that the resource tracker of this process will not unlink when the process exits.
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+
+    block = shared_memory.SharedMemory(create=True, size=size)
+    if os.name == 'posix':
+        # The block is registered under its POSIX name, which is its name with a leading slash.
+        resource_tracker.unregister('/' + block.name, 'shared_memory')
+
+    return block
+
+
+def from_shared_memory(name: str, offsets: np.ndarray):
+    # Copy a CurveArray out of a shared memory block written by to_shared_memory, then unlink the block.
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        vertices = np.ndarray((offsets[-1], 2), dtype=float, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+    return CurveArray(vertices, offsets)
@@ -0,0 +1,108 @@
+import functools
+import importlib.util
+import math
+import warnings
+
+import numpy as np
+
+# Numba is optional.  Without it the kernels run as plain Python, which gives the same results far more slowly, and
+# the NumPy backend of CurveState is used by default.  Numba is slow to import, so it is only found here, and is
+# imported when a kernel is first called.
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+
+def _jit(function):
+    if not NUMBA_AVAILABLE:
+        return function
+
+    compiled = None
+
+    @functools.wraps(function)
+    def _compile_on_first_call(*args):
+        nonlocal compiled
+        if compiled is None:
+            compiled = _compile(function)
+
+        return compiled(*args)
+
+    return _compile_on_first_call
+
+
+def _compile(function):
+    # Numba can be found but fail to import, as when it was built against another version of NumPy.  The kernel then
+    # runs as plain Python, and CurveState switches to its NumPy backend.
+
+    global NUMBA_AVAILABLE
+
+    if NUMBA_AVAILABLE:
+        try:
+            import numba
+        except ImportError as error:
+            warnings.warn(f"Numba could not be imported ({error}), the numpy backend is used instead.")
+            NUMBA_AVAILABLE = False
+
+            import _curve_state
+
+            if _curve_state.BACKEND == 'numba':
+                _curve_state.BACKEND = 'numpy'
+        else:
+            return numba.njit(cache=True, nogil=True)(function)
+
+    return function
+
+
+@_jit
+def curve_geometry(curve: np.ndarray, difference: np.ndarray, edge_lengths: np.ndarray, tangent: np.ndarray,
+                   normal: np.ndarray, inward_normal: np.ndarray, curvature: np.ndarray):
+    # Geometry of a closed curve in two passes over its vertices, written into the given arrays.
+    # Matches the NumPy computation of CurveState, returning its total length and concavity.
+
+    n = curve.shape[0]
+    total_length = 0.
+
+    # Edges, from each vertex's predecessor to the vertex, and unit tangents.
+    for i in range(n):
+        h = i - 1 if i > 0 else n - 1
+
+        dx = curve[i, 0] - curve[h, 0]
+        dy = curve[i, 1] - curve[h, 1]
+        edge = math.sqrt(dx * dx + dy * dy)
+
+        difference[i, 0] = dx
+        difference[i, 1] = dy
+        edge_lengths[i] = edge
+        total_length += edge
+
+        if edge == 0:
+            edge = 10e-5
+        tangent[i, 0] = dx / edge
+        tangent[i, 1] = dy / edge
+
+        # Tangent rotated clockwise 90 degrees.
+        inward_normal[i, 0] = tangent[i, 1]
+        inward_normal[i, 1] = -tangent[i, 0]
+
+    # Normals from the change of tangent, and curvature k = (x'y" - x"y') / (x'**2 + y'**2)**(3/2).
+    concavity = 0.
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+
+        second_diff_edge = edge_lengths[j] + edge_lengths[i]
+        if second_diff_edge == 0:
+            second_diff_edge = 10e-5
+        normal[i, 0] = 2 * (tangent[j, 0] - tangent[i, 0]) / second_diff_edge
+        normal[i, 1] = 2 * (tangent[j, 1] - tangent[i, 1]) / second_diff_edge
+
+        # The tangent of a repeated vertex is zero, and its curvature undefined, as 0 / 0 is in NumPy.
+        speed = tangent[i, 0] * tangent[i, 0] + tangent[i, 1] * tangent[i, 1]
+        if speed > 0:
+            k = (tangent[i, 1] * normal[i, 0] - normal[i, 1] * tangent[i, 0]) / (speed * math.sqrt(speed))
+        else:
+            k = math.nan
+        curvature[i] = k
+
+        # Undefined curvature is ignored, as in np.fmin.
+        if k < 0:
+            concavity -= k
+
+    return total_length, concavity
@@ -0,0 +1,139 @@
+import warnings
+
+import numpy as np
+
+import _curve_kernels
+import _metrics
+import _workspace
+
+BACKENDS = ('numpy', 'numba')
+
+# Backend used by states that do not name one.  Numba, when it is installed, computes the state in one compiled
+# kernel instead of a sequence of NumPy operations.
+BACKEND = 'numba' if _curve_kernels.NUMBA_AVAILABLE else 'numpy'
+
+
+def set_backend(backend: str):
+    global BACKEND
+
+    BACKEND = _check_backend(backend)
+
+
+def _check_backend(backend: str):
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+
+    if backend == 'numba' and not _curve_kernels.NUMBA_AVAILABLE:
+        warnings.warn("Numba is not installed, the numpy backend is used instead.")
+        return 'numpy'
+
+    return backend
+
+
+class CurveState:
+    """
+    Geometry of a closed curve, derived in a single pass.
+
+    Edge lengths, tangents, normals, curvature, concavity and total length are computed once from the same set of
+    periodic vertex differences.  The values match those returned by the equivalent functions in _vector_maths
+    and _metrics, which each recompute their own differences.
+
+    If a workspace is given, every array is written into it and is overwritten by the next state computed with the
+    same workspace.
+
+    :param curve: Nx2 Numpy array, where N is the number of vertices in the curve.
+    :param workspace: Optional ECSFWorkspace to hold the arrays of the state.
+    :param backend: 'numpy' or 'numba'.  Defaults to the module's BACKEND.
+    """
+    def __init__(self, curve: np.ndarray, workspace: _workspace.ECSFWorkspace = None, backend: str = None):
+        if workspace is None:
+            workspace = _workspace.ECSFWorkspace(curve.shape[0])
+
+        self.curve = curve
+        self._workspace = workspace
+        self._enclosed_area = None
+
+        if (BACKEND if backend is None else _check_backend(backend)) == 'numba':
+            self._compute_numba(curve, workspace)
+        else:
+            self._compute_numpy(curve, workspace)
+
+    def _compute_numba(self, curve: np.ndarray, workspace: _workspace.ECSFWorkspace):
+        n = curve.shape[0]
+
+        self.edge_lengths = workspace.array('state_edge_lengths', n)
+        self.tangent = workspace.array('state_tangent', n, 2)
+        self.normal = workspace.array('state_normal', n, 2)
+        self.inward_normal = workspace.array('state_inward_normal', n, 2)
+        self.curvature = workspace.array('state_curvature', n)
+
+        self.total_length, self.concavity = _curve_kernels.curve_geometry(
+            np.asarray(curve, dtype=float), workspace.array('state_difference', n, 2), self.edge_lengths,
+            self.tangent, self.normal, self.inward_normal, self.curvature)
+
+    def _compute_numpy(self, curve: np.ndarray, workspace: _workspace.ECSFWorkspace):
+        n = curve.shape[0]
+
+        difference, self.edge_lengths = workspace.differences(curve, 'state_')
+        self.total_length = self.edge_lengths.sum()
+
+        edge = workspace.array('state_safe_edge_lengths', n)
+        is_zero = workspace.array('state_is_zero', n, dtype=bool)
+        np.copyto(edge, self.edge_lengths)
+        np.equal(edge, 0, out=is_zero)
+        np.copyto(edge, 10e-5, where=is_zero)
+        self.tangent = workspace.array('state_tangent', n, 2)
+        np.divide(difference, edge[:, None], out=self.tangent)
+
+        second_diff_edge = workspace.array('state_second_diff_edge', n)
+        np.add(self.edge_lengths[1:], self.edge_lengths[:-1], out=second_diff_edge[:-1])
+        np.add(self.edge_lengths[0], self.edge_lengths[-1], out=second_diff_edge[-1:])
+        np.equal(second_diff_edge, 0, out=is_zero)
+        np.copyto(second_diff_edge, 10e-5, where=is_zero)
+
+        self.normal = workspace.array('state_normal', n, 2)
+        np.subtract(self.tangent[1:], self.tangent[:-1], out=self.normal[:-1])
+        np.subtract(self.tangent[0], self.tangent[-1], out=self.normal[-1])
+        np.multiply(self.normal, 2, out=self.normal)
+        np.divide(self.normal, second_diff_edge[:, None], out=self.normal)
+
+        # Tangent rotated clockwise 90 degrees.
+        self.inward_normal = workspace.array('state_inward_normal', n, 2)
+        np.copyto(self.inward_normal[:, 0], self.tangent[:, 1])
+        np.negative(self.tangent[:, 0], out=self.inward_normal[:, 1])
+
+        # k = (x'y" - x"y') / (x'**2 + y'**2)**(3/2)
+        self.curvature = workspace.array('state_curvature', n)
+        cross = workspace.array('state_cross', n)
+        speed = workspace.array('state_speed', n)
+        np.multiply(self.tangent[:, 1], self.normal[:, 0], out=self.curvature)
+        np.multiply(self.normal[:, 1], self.tangent[:, 0], out=cross)
+        np.subtract(self.curvature, cross, out=self.curvature)
+        np.square(self.tangent[:, 1], out=speed)
+        np.square(self.tangent[:, 0], out=cross)
+        np.add(speed, cross, out=speed)
+        np.power(speed, 3 / 2, out=speed)
+        np.divide(self.curvature, speed, out=self.curvature)
+
+        # Sum of the negative curvature.  fmin ignores undefined curvature, as the comparison k < 0 would.
+        np.fmin(self.curvature, 0, out=cross)
+        self.concavity = -cross.sum()
+
+    def enclosed_area(self):
+        # Computed on first use, since not every step needs it.
+
+        if self._enclosed_area is None:
+            self._enclosed_area = _metrics.enclosed_area(self.curve)
+
+        return self._enclosed_area
+
+    def normalised_curvature_positive_l1(self):
+        # Scale curvature such that the maximum positive curvature is one.
+        # If no positive curvature, return unscaled.
+
+        norm = np.max(self.curvature)
+        if norm <= 0:
+            return self.curvature
+        else:
+            out = self._workspace.array('state_normalised_curvature', self.curvature.shape[0])
+            return np.divide(self.curvature, norm, out=out)
@@ -1,37 +1,36 @@
-import numpy as np
+import collections
 
-import skgeom
+import numpy as np
 
-from skimage import morphology
-from typing import Tuple
+from abc import ABCMeta, abstractmethod
+from scipy import ndimage
+from skimage import measure, morphology
+from typing import List, NamedTuple, Optional, Tuple
 
+import _metrics
 import _neighbour_array
 import _image_processing
+import _utils
 
-class ImageCurve:
-    def __init__(self, im: np.ndarray):
-        self._prepare_im(im)
-        self._im_curve = _edge_detect(self._im)
-        self._visited = set()
-        self._start = self._starting_point()
+# Neighbours of each of the 256 neighbour codes, in the order in which the trace tries them.
+_NEIGHBOUR_COORDINATES_TABLE = _neighbour_array.neighbour_coordinates_table()
 
-    def _prepare_im(self, im):
-        # Flatten values such that image is binary.
-        self._im = np.where(im, 1, 0)
 
-        # If background (indicated by top-left pixel) is 1, invert image.
-        self._im = self._im ^ self._im[0, 0]
-
-        # Added single pad layer to prevent edge cases in search.
-        self._im = np.pad(self._im, 1)
+class _EdgeCurve(metaclass=ABCMeta):
+    # Tracing of the edge of a silhouette from its starting vertex, shared by ImageCurve and TiledImageCurve.  They
+    # differ in how the edge pixels are held, given by _starting_point(), _neighbourhood() and curve().
 
+    @abstractmethod
     def _starting_point(self):
-        # List of vertices starts at the vertex with minimum index (most top-left corner vertex).
+        pass
 
-        if not self._im.any():
-            return np.array([])
+    @abstractmethod
+    def _neighbourhood(self, point: np.ndarray):
+        pass
 
-        return np.argwhere(self._im)[0]
+    @abstractmethod
+    def curve(self):
+        pass
 
     def _second_point(self):
         # List moves clockwise with next vertex preference in order: East, South-East, South.
@@ -69,21 +68,6 @@ class ImageCurve:
 
         return self._start + n
 
-    def _neighbourhood(self, point: np.ndarray):
-        # Returns 3x3 matrix of points in image around given point.
-
-        return self._im_curve[point[0] - 1:point[0] + 2, point[1] - 1:point[1] + 2]
-
-    def _next_neighbour(self, point: np.ndarray):
-        neighbours = list()
-        neighbourhood = self._neighbourhood(point)
-        [neighbours.append(point + n) for n in _neighbour_array.side_neighbour_coordinates(neighbourhood) |
-         _neighbour_array.diagonal_neighbour_coordinates(neighbourhood)]
-
-        neighbours = [n for n in neighbours if tuple(n) not in self._visited]
-
-        return neighbours[0] if neighbours else None
-
     def start(self):
         # Returns the starting index of the vertex list.
 
@@ -92,25 +76,231 @@ class ImageCurve:
     def _unpad(self, point: np.ndarray):
         return point - (1, 1)
 
+    def _trace(self, codes, visited, width: int):
+        # DFS of curve(), over the neighbour codes and visited flags of the pixels, indexed by flat index into the
+        # padded image of the given width.
+
+        offsets = [tuple(dx * width + dy for dx, dy in coordinates) for coordinates in _NEIGHBOUR_COORDINATES_TABLE]
+
+        start = int(self._start[0]) * width + int(self._start[1])
+        second_point, last_point = self._second_point(), self._last_point()
+        last = int(last_point[0]) * width + int(last_point[1])
+
+        visited[start] = 1
+        visited[last] = 1
+
+        curve = [start]
+        curr = int(second_point[0]) * width + int(second_point[1])
+        while curr is not None:
+            visited[curr] = 1
+            curve.append(curr)
+
+            following = None
+            for offset in offsets[codes[curr]]:
+                if not visited[curr + offset]:
+                    following = curr + offset
+                    break
+            curr = following
+        curve.append(last)
+
+        return self._unpad(np.column_stack(np.divmod(np.array(curve), width)))
+
+
+class ImageCurve(_EdgeCurve):
+    def __init__(self, im: np.ndarray):
+        self._prepare_im(im)
+        self._im_curve = _edge_detect(self._im)
+        self._start = self._starting_point()
+
+    def _prepare_im(self, im):
+        # Flatten values such that image is binary, in one byte per pixel.
+        self._im = np.where(im, np.uint8(1), np.uint8(0))
+
+        # If background (indicated by top-left pixel) is 1, invert image.
+        self._im = self._im ^ self._im[0, 0]
+
+        # Added single pad layer to prevent edge cases in search.
+        self._im = np.pad(self._im, 1)
+
+    def _starting_point(self):
+        # List of vertices starts at the vertex with minimum index (most top-left corner vertex).
+
+        if not self._im.any():
+            return np.array([])
+
+        return np.array(np.unravel_index(np.argmax(self._im), self._im.shape))
+
+    def _neighbourhood(self, point: np.ndarray):
+        # Returns 3x3 matrix of points in image around given point.
+
+        return self._im_curve[point[0] - 1:point[0] + 2, point[1] - 1:point[1] + 2]
+
     def curve(self):
         #  Create list of vertices, starting at the top-leftmost vertex and traversing clockwise using DFS.
+        #  Each vertex moves to its first unvisited neighbour on the edge, in the order given for its neighbour code
+        #  by the lookup table.  Pixels are addressed by flat index, with the neighbour codes of the edge pixels and
+        #  the visited pixels held in byte arrays of the image's size.
 
         if not self._im.any():
             return np.array([])
 
-        curve = [self._start]
-        self._visited = set()
-        self._visited.add(tuple(self._start))
-        self._visited.add(tuple(self._last_point()))
+        height, width = self._im_curve.shape
+        codes = bytearray(height * width)
+        edge = np.flatnonzero(self._im_curve != 0)
+        np.frombuffer(codes, dtype=np.uint8)[edge] = _neighbour_array.neighbour_codes(self._im_curve, edge)
 
-        curr = self._second_point()
-        while curr is not None:
-            self._visited.add(tuple(curr))
-            curve.append(curr)
-            curr = self._next_neighbour(curr)
-        curve.append(self._last_point())
+        return self._trace(codes, bytearray(height * width), width)
+
+    def subpixel_curve(self, spacing: float = 1, sigma: float = 0):
+        #  Sub-pixel outline by marching squares, at the level halfway between background and silhouette, which runs
+        #  through the midpoints of the pixel edges between them.  If sigma is given, the image is first smoothed by a
+        #  Gaussian filter of that standard deviation, which rounds off the steps of the pixel grid.
+        #  Of the contours found, the outline is the one passing closest to the top edge of the starting vertex.  It is
+        #  turned to run clockwise from there, as curve() does, and resampled to vertices spacing apart.
+
+        if not self._im.any():
+            return np.array([])
 
-        return self._unpad(np.array(curve))
+        im = self._im.astype(float)
+        if sigma:
+            im = ndimage.gaussian_filter(im, sigma, mode='constant')
+
+        # Closed contours end with their first point repeated.
+        top_edge = self._start - (0.5, 0)
+        contours = [contour[:-1] for contour in measure.find_contours(im, 0.5) if len(contour) > 3]
+        if not contours:
+            return np.array([])
+        distances = [np.min(np.sum((contour - top_edge) ** 2, axis=1)) for contour in contours]
+        outline = contours[int(np.argmin(distances))]
+
+        if not _metrics.is_clockwise(outline):
+            outline = outline[::-1]
+        outline = np.roll(outline, -int(np.argmin(np.sum((outline - top_edge) ** 2, axis=1))), axis=0)
+
+        return self._unpad(_utils.resample(outline, 1 / spacing))
+
+
+class TiledImageCurve(_EdgeCurve):
+    def __init__(self, im: np.ndarray, tile_rows: int = 1024):
+        # ImageCurve of an image too large to copy whole, such as a np.memmap from np.load(path, mmap_mode='r').
+        # The image is read in strips of tile_rows rows, in which its edge pixels are found and coded by their
+        # neighbours on the edge.  Only the edge pixels and their codes are kept, so memory is bounded by a small
+        # multiple of one strip, and by the number of edge pixels.
+        # Pixels are addressed by flat index into the image padded by one pixel, as in ImageCurve.
+
+        self._shape = im.shape[0] + 2, im.shape[1] + 2
+        self._edge, self._codes = _tiled_edge_codes(im, tile_rows)
+        self._start = self._starting_point()
+
+    def _starting_point(self):
+        # The top-left-most pixel of the silhouette is the first of its edge.
+
+        if not self._edge.size:
+            return np.array([])
+
+        return np.array(np.unravel_index(self._edge[0], self._shape))
+
+    def _neighbourhood(self, point: np.ndarray):
+        # Returns 3x3 matrix of the edge pixels around a given point on the edge.
+
+        flat_index = np.ravel_multi_index(tuple(point), self._shape)
+        return _neighbour_array.binary_to_array(int(self._codes[np.searchsorted(self._edge, flat_index)]))
+
+    def curve(self):
+        # As ImageCurve.curve(), with the codes and visited flags held only for the pixels on and around the edge.
+
+        if not self._edge.size:
+            return np.array([])
+
+        codes = dict(zip(self._edge.tolist(), self._codes.tolist()))
+        return self._trace(codes, collections.defaultdict(int), self._shape[1])
+
+
+def _tiled_edge_codes(im: np.ndarray, tile_rows: int):
+    # Flat indices, into the image padded by one pixel, of the pixels of _edge_detect of the prepared image, and their
+    # neighbour codes, in raster order.  Each strip of tile_rows rows is read with a halo of two rows on either side,
+    # the edge of the strip needing the rows next to it, and the codes of the strip the edge of the rows next to it.
+    # Strips are made binary and inverted if the background (indicated by top-left pixel) is 1, as in ImageCurve.
+
+    height, width = im.shape
+    background = bool(im[0, 0])
+
+    edges, codes = [], []
+    for top in range(0, height, tile_rows):
+        bottom = min(top + tile_rows, height)
+        halo_top, halo_bottom = max(top - 2, 0), min(bottom + 2, height)
+
+        # Rows from top - 2 to bottom + 2, padded by one column, with the outside of the image as background.
+        strip = np.zeros((bottom - top + 4, width + 2), dtype=np.uint8)
+        strip[halo_top - top + 2:halo_bottom - top + 2, 1:-1] = (np.asarray(im[halo_top:halo_bottom]) != 0) ^ background
+
+        # Edge of rows top - 1 to bottom + 1, and its pixels on the rows of the strip.
+        edge = _edge_detect(strip)[1:-1]
+        strip_edge = np.flatnonzero(edge[1:-1]) + edge.shape[1]
+
+        codes.append(_neighbour_array.neighbour_codes(edge, strip_edge))
+        edges.append(strip_edge + top * edge.shape[1])
+
+    return np.concatenate(edges), np.concatenate(codes)
+
+
+class ImageContour(NamedTuple):
+    curve: np.ndarray
+    parent: Optional[int]
+    is_hole: bool
+    pixels: int
+
+
+def image_contours(im: np.ndarray, min_pixels: int = 1) -> List[ImageContour]:
+    # Outlines of every silhouette in an image, and of every hole in them, from one labelling of the image.
+    # Silhouettes are the 8-connected components of the foreground, and holes the 4-connected components of the
+    # background that do not reach the edge of the image, so that the outlines of neighbouring regions never cross.
+    # Each region is traced by ImageCurve within its bounding box, so the image is only scanned by the labelling.
+    #
+    # Contours are in raster order of their top-left-most pixels, and parent is the index of the contour of the
+    # region enclosing them, or None for silhouettes on the background.  The pixel directly above the top-left-most
+    # pixel of a region is in the region enclosing it, so parents come before their children.  Regions of fewer than
+    # min_pixels pixels are left out, and their children given to the enclosing region.
+
+    # Binary image, inverted if the background (indicated by top-left pixel) is 1, and padded so that the background
+    # around the silhouettes is a single region.
+    im = np.where(im, 1, 0)
+    im = np.pad(im ^ im[0, 0], 1)
+
+    silhouette_labels, _ = ndimage.label(im, structure=np.ones((3, 3)))
+    hole_labels, _ = ndimage.label(1 - im)
+
+    regions = []
+    for is_hole, labels in ((False, silhouette_labels), (True, hole_labels)):
+        for label, bbox in enumerate(ndimage.find_objects(labels), 1):
+            if is_hole and label == hole_labels[0, 0]:
+                continue
+            first = bbox[0].start, bbox[1].start + int(np.argmax(labels[bbox][0] == label))
+            regions.append((first, is_hole, label, bbox))
+    regions.sort(key=lambda region: region[0])
+
+    contours = []
+    contour_index = {}
+    for (x, y), is_hole, label, bbox in regions:
+        labels, enclosing_labels = (hole_labels, silhouette_labels) if is_hole else (silhouette_labels, hole_labels)
+        enclosing_label = enclosing_labels[x - 1, y]
+        if not is_hole and enclosing_label == hole_labels[0, 0]:
+            parent = None
+        else:
+            parent = contour_index[not is_hole, enclosing_label]
+
+        region = labels[bbox] == label
+        pixels = int(np.count_nonzero(region))
+        if pixels < min_pixels:
+            contour_index[is_hole, label] = parent
+            continue
+
+        # The region is padded by one pixel for ImageCurve, as is the image, which are removed from its outline.
+        curve = ImageCurve(np.pad(region, 1)).curve() + (bbox[0].start - 2, bbox[1].start - 2)
+        contour_index[is_hole, label] = len(contours)
+        contours.append(ImageContour(curve, parent, is_hole, pixels))
+
+    return contours
 
 
 def _edge_detect(array: np.ndarray) -> np.ndarray:
@@ -126,6 +316,9 @@ def curve_to_image_matrix(curve: np.ndarray, shape: Tuple) -> np.ndarray:
     # Convert a closed curve, defined by a list of coordinates, to a matrix of pixels.
     # Matrix is of size (shape), if this is big enough to fit the curve.
     # Otherwise, a bounding box with one pixel padding is used
+    # scikit-geometry is only needed here, so it is imported when called.
+
+    import skgeom
 
     polygon = skgeom.Polygon(curve)
     bbox = polygon.bbox()
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+def self_intersections(curve: np.ndarray, moved: np.ndarray = None, cell_size: float = None):
+    """
+    Pairs of crossing edges of a closed curve, found with a uniform grid spatial hash.
+
+    Edge i runs from curve[i] to curve[i+1], and from the last vertex back to the first.  Each edge is entered in every
+    grid cell its bounding box touches, and only edges sharing a cell are tested against each other, so the cost grows
+    with the number of edges rather than its square.  Neighbouring edges, which always share a vertex, and edges that
+    only touch are not counted.
+
+    :param curve: Nx2 Numpy array of the vertices of a closed curve.
+    :param moved: Boolean array of the edges that moved since the curve was last found free of crossings.  If given,
+    only pairs with at least one moved edge are tested.
+    :param cell_size: Side length of the grid cells.  Defaults to twice the mean edge length.
+    :return: Kx2 Numpy array of the indices of the crossing edges, each pair listed once with the lower index first.
+    """
+    n = curve.shape[0]
+    if n < 4:
+        return np.empty((0, 2), dtype=int)
+
+    start = curve
+    end = np.roll(curve, -1, axis=0)
+
+    if cell_size is None:
+        cell_size = 2 * np.sqrt(((end - start) ** 2).sum(axis=1)).mean()
+    if not cell_size > 0:
+        return np.empty((0, 2), dtype=int)
+
+    # Grid cells spanned by the bounding box of each edge.
+    origin = curve.min(axis=0)
+    cell_min = ((np.minimum(start, end) - origin) // cell_size).astype(np.int64)
+    cell_max = ((np.maximum(start, end) - origin) // cell_size).astype(np.int64)
+    span = cell_max - cell_min + 1
+    n_cells = span[:, 0] * span[:, 1]
+
+    # One entry per edge per cell, keyed by the cell's position in the grid.
+    edge = np.repeat(np.arange(n), n_cells)
+    local = np.arange(n_cells.sum()) - np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+    cell_x = cell_min[edge, 0] + local // span[edge, 1]
+    cell_y = cell_min[edge, 1] + local % span[edge, 1]
+    key = cell_x * (cell_max[:, 1].max() + 1) + cell_y
+
+    order = np.argsort(key, kind='stable')
+    key, edge = key[order], edge[order]
+
+    # Every pair of edges within a cell, found by comparing each entry with those k places after it.
+    first, second = [], []
+    for k in range(1, key.shape[0]):
+        same_cell = key[:-k] == key[k:]
+        if not same_cell.any():
+            break
+        first.append(edge[:-k][same_cell])
+        second.append(edge[k:][same_cell])
+
+    if not first:
+        return np.empty((0, 2), dtype=int)
+
+    first, second = np.concatenate(first), np.concatenate(second)
+    first, second = np.minimum(first, second), np.maximum(first, second)
+
+    candidates = (second - first != 1) & (second - first != n - 1)
+    if moved is not None:
+        candidates &= moved[first] | moved[second]
+    first, second = first[candidates], second[candidates]
+
+    crossing = _edges_cross(start[first], end[first], start[second], end[second])
+
+    return np.unique(np.column_stack((first[crossing], second[crossing])), axis=0)
+
+
+def crossing_points(curve: np.ndarray, pairs: np.ndarray):
+    # Points where each pair of edges from self_intersections cross.
+
+    p1, q1 = curve[pairs[:, 0]], curve[pairs[:, 1]]
+    p_direction = np.roll(curve, -1, axis=0)[pairs[:, 0]] - p1
+    q_direction = np.roll(curve, -1, axis=0)[pairs[:, 1]] - q1
+
+    # p1 + t * p_direction = q1 + u * q_direction, solved for t.
+    denominator = p_direction[:, 0] * q_direction[:, 1] - p_direction[:, 1] * q_direction[:, 0]
+    t = ((q1[:, 0] - p1[:, 0]) * q_direction[:, 1] - (q1[:, 1] - p1[:, 1]) * q_direction[:, 0]) / denominator
+
+    return p1 + t[:, None] * p_direction
+
+
+def _edges_cross(p1: np.ndarray, p2: np.ndarray, q1: np.ndarray, q2: np.ndarray):
+    # Edges p and q cross if the ends of each lie strictly on opposite sides of the other.
+
+    def orientation(a, b, c):
+        return (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+    return ((orientation(p1, p2, q1) * orientation(p1, p2, q2) < 0)
+            & (orientation(q1, q2, p1) * orientation(q1, q2, p2) < 0))
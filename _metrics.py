@@ -1,5 +1,4 @@
 import numpy as np
-import skgeom
 
 import _vector_maths
 
@@ -49,11 +48,29 @@ def concavity(curve: np.ndarray):
     return -sum(curvature_[curvature_ < 0])
 
 
-def enclosed_area(curve: np.ndarray):
-    # scikit-geometry calculates the area of clockwise curves as negative and counter-clockwise as positive.
-    # Since only simple curves are considered, the absolute value is returned to avoid ambiguity.
+def signed_area(curve: np.ndarray):
+    # Shoelace formula, A = 1/2 * sum(x_i * y_i+1 - x_i+1 * y_i), over the closed curve.
+    # Positive for counter-clockwise curves and negative for clockwise, as scikit-geometry calculates it.
 
-    return abs(float(skgeom.Polygon(curve).area()))
+    x, y = curve[:, 0], curve[:, 1]
+
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]) + x[-1] * y[0] - x[0] * y[-1])
+
+
+def is_clockwise(curve: np.ndarray):
+    return signed_area(curve) < 0
+
+
+def enclosed_area(curve: np.ndarray, exact: bool = False):
+    # Since only simple curves are considered, the absolute value of the signed area is returned to avoid ambiguity.
+    # If exact, the area is calculated by scikit-geometry in exact arithmetic, at the cost of constructing a polygon.
+
+    if exact:
+        import skgeom
+
+        return abs(float(skgeom.Polygon(curve).area()))
+
+    return abs(signed_area(curve))
 
 
 def mean_distance_to_centre_of_mass(curve: np.ndarray):
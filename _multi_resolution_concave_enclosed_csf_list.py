@@ -0,0 +1,123 @@
+import numpy as np
+
+import _metrics
+import _utils
+from _concave_enclosed_csf_list import ConcaveEnclosedCSFList
+
+# Smallest standard deviation, in vertices, of the Gaussian filter of the resample.  Below it, the filter no longer
+# damps the alternating vertex mode excited by resampling a coarse curve, and the curve grows loops.
+MIN_RESAMPLE_SIGMA = 0.5
+
+
+class MultiResolutionConcaveEnclosedCSFList(ConcaveEnclosedCSFList):
+    """
+    Enclosed curve shortening flow run on a decimated curve, refined to full resolution for its output.
+
+    The flow runs on the curve resampled to 1/coarsening of its vertices.  The filters of the flow are sized in
+    vertices and the concavity sums over vertices, so they are scaled by 1/coarsening to keep their size along the
+    curve, and each iteration costs about 1/coarsening as much.  The step size is in units of the image and is kept.
+    Saved curves are resampled back to the vertex spacing of the initial curve.
+
+    The filter of the resample is not scaled below MIN_RESAMPLE_SIGMA, so with a coarsening above
+    1 / (2 * MIN_RESAMPLE_SIGMA) it smooths more than the full flow does, and the curves shrink by a different path.
+
+    The coarsening is halved until the decimated initial curve encloses an area within max_area_error of the initial
+    area.  Once the area falls below refine_area_fraction of the initial area, the flow continues at full resolution.
+    The relative change of area at each change of resolution is kept in area_errors.
+
+    Other parameters are those of ConcaveEnclosedCSFList, at full resolution.
+
+    :param coarsening: Factor by which the vertex spacing of the coarse flow exceeds that of the initial curve.
+    :param max_area_error: Largest relative change of area allowed when decimating the initial curve.
+    :param refine_area_fraction: If given, continue at full resolution once the enclosed area falls below this
+    fraction of the initial area.
+    """
+    def __init__(self, curve: np.ndarray,
+                 coarsening: float = 2,
+                 max_area_error: float = 0.01,
+                 refine_area_fraction: float = None,
+                 **kwargs):
+        super().__init__(curve, **kwargs)
+
+        self.max_area_error = max_area_error
+        self.refine_area_fraction = refine_area_fraction
+        self.fine_resampling_factor = self.resampling_factor
+        self.fine_step_sigma = self.step_sigma
+        self.fine_resample_sigma = self.resample_sigma
+        self.fine_concavity_threshold = self.conditional_terminator.concavity_threshold
+        self.area_errors = []
+
+        self.initial_coarsening, self.coarse_curve = self._decimate(self.initial_curve, coarsening)
+        self.coarsening = self.initial_coarsening
+        self._set_resolution(self.coarsening)
+
+    def _decimate(self, curve: np.ndarray, coarsening: float):
+        # Halve the coarsening until the decimated curve keeps the area to within max_area_error.
+
+        while coarsening > 1:
+            decimated = _utils.resample(curve, self.fine_resampling_factor / coarsening)
+            area_error = abs(_metrics.enclosed_area(decimated) / self.initial_area - 1)
+            if decimated.shape[0] >= 3 and area_error <= self.max_area_error:
+                self.area_errors.append(area_error)
+                return coarsening, decimated
+            coarsening /= 2
+
+        return 1, curve
+
+    def _start_curve(self):
+        self.coarsening = self.initial_coarsening
+        self._set_resolution(self.coarsening)
+        self.area_errors = self.area_errors[:1]
+
+        return self.coarse_curve
+
+    def _restore(self, checkpoint):
+        # A checkpoint taken after refinement holds a curve at the vertex spacing of the initial curve.  The resolution
+        # is set first, so that the resampler resumes at it.
+
+        coarsening = self.fine_resampling_factor / checkpoint.resampling_factor
+        if not np.isclose(coarsening, self.coarsening):
+            self.coarsening = coarsening
+            self._set_resolution(coarsening)
+
+        super()._restore(checkpoint)
+
+    def _set_resolution(self, coarsening: float):
+        self.resampling_factor = self.fine_resampling_factor / coarsening
+        self.resampler.resampling_factor = self.resampling_factor
+        self.step_sigma = self.fine_step_sigma / coarsening
+        self.resample_sigma = max(self.fine_resample_sigma / coarsening,
+                                  min(self.fine_resample_sigma, MIN_RESAMPLE_SIGMA))
+        self.conditional_terminator.concavity_threshold = self.fine_concavity_threshold / coarsening
+
+    def _is_time_to_refine(self):
+        return (self.coarsening > 1
+                and self.refine_area_fraction is not None
+                and self.curr_state.enclosed_area() < self.refine_area_fraction * self.initial_area)
+
+    def _refine(self):
+        coarse_area = self.curr_state.enclosed_area()
+
+        self.coarsening = 1
+        self._set_resolution(1)
+        self.curr_curve = _utils.resample(self.curr_curve, self.resampling_factor)
+        self._update_state(self.workspace)
+        self.conditional_terminator.next_step(self.curr_state.concavity)
+
+        self.area_errors.append(abs(self.curr_state.enclosed_area() / coarse_area - 1))
+
+    def _saved_curves(self):
+        # Saved curves are given the vertex spacing of the initial curve.
+
+        saved_curves = super()._saved_curves()
+        if self.coarsening == 1:
+            return saved_curves
+
+        return [saved._replace(curve=_utils.resample(saved.curve, self.fine_resampling_factor))
+                for saved in saved_curves]
+
+    def _step(self):
+        super()._step()
+
+        if self._is_time_to_refine():
+            self._refine()
@@ -5,6 +5,16 @@ NEIGHBOUR_REF = np.array([[7, 0, 1],
                           [6, 8, 2],
                           [5, 4, 3]])
 
+# Offset of each neighbour, in the order of get_shifted_neighbour_arrays, and the bit it sets in a neighbour code.
+NEIGHBOUR_OFFSETS = [(x - 1, y - 1) for x in range(3) for y in range(3) if x != 1 or y != 1]
+NEIGHBOUR_BIT_SHIFTS = [7, 0, 1, 6, 2, 5, 4, 3]
+
+SECOND_NEIGHBOUR_MASK = np.array([[2 ** 15, 1, 2, 4, 8],
+                                  [2 ** 14, 0, 0, 0, 16],
+                                  [2 ** 13, 0, 0, 0, 32],
+                                  [2 ** 12, 0, 0, 0, 64],
+                                  [2 ** 11, 1024, 512, 256, 128]])
+
 
 def binary_to_array(b: int):
     arr = np.zeros((3, 3), dtype='bool')
@@ -31,25 +41,80 @@ def array_to_binary(array: np.ndarray):
 def second_neighbours_array_to_binary(arr: np.ndarray):
     assert arr.shape == (5, 5)
 
-    mask = np.array([[2 ** 15, 1, 2, 4, 8],
-                     [2 ** 14, 0, 0, 0, 16],
-                     [2 ** 13, 0, 0, 0, 32],
-                     [2 ** 12, 0, 0, 0, 64],
-                     [2 ** 11, 1024, 512, 256, 128]])
-
-    return np.sum(mask * arr)
+    return np.sum(SECOND_NEIGHBOUR_MASK * arr)
 
 
 def get_neighbour_array(array: np.ndarray):
     shifted_neighbour_arrays = get_shifted_neighbour_arrays(array)
     neighbour_array = np.zeros(array.shape, dtype='int')
-    neighbour_bit_shifts = [7, 0, 1, 6, 2, 5, 4, 3]
     for i, arr in enumerate(shifted_neighbour_arrays):
-        neighbour_array |= arr << neighbour_bit_shifts[i]
+        neighbour_array |= arr << NEIGHBOUR_BIT_SHIFTS[i]
 
     return neighbour_array
 
 
+def get_second_neighbour_array(array: np.ndarray):
+    # Code of the ring of second neighbours of every pixel, as second_neighbours_array_to_binary gives for its 5x5
+    # neighbourhood.
+
+    padded_array = np.pad(array, 2)
+    second_neighbour_array = np.zeros(array.shape, dtype='int')
+    for x, y in zip(*np.nonzero(SECOND_NEIGHBOUR_MASK)):
+        shift = int(SECOND_NEIGHBOUR_MASK[x, y]).bit_length() - 1
+        shifted_array = padded_array[x:padded_array.shape[0] + x - 4, y:padded_array.shape[1] + y - 4]
+        second_neighbour_array |= shifted_array << shift
+
+    return second_neighbour_array
+
+
+def neighbour_codes(array: np.ndarray, flat_indices: np.ndarray):
+    # Values of get_neighbour_array at the given flat indices of a binary array, none of which may lie on its border.
+    # Only the given pixels are coded, so no array of the image's size is allocated.
+
+    flat_array = array.ravel()
+    width = array.shape[1]
+    codes = np.zeros(flat_indices.shape[0], dtype=np.uint8)
+    for (dx, dy), shift in zip(NEIGHBOUR_OFFSETS, NEIGHBOUR_BIT_SHIFTS):
+        codes |= (flat_array[flat_indices + dx * width + dy] != 0).astype(np.uint8) << shift
+
+    return codes
+
+
+def neighbour_coordinates_table():
+    # Coordinates of the neighbours present in each of the 256 neighbour codes, side and diagonal, in the order in
+    # which their sets are iterated.
+
+    return [tuple(_side_neighbour_coordinates(b) | _diagonal_neighbour_coordinates(b)) for b in range(256)]
+
+
+def number_of_neighbours_array(neighbour_array: np.ndarray):
+    return NUMBER_OF_NEIGHBOURS[neighbour_array]
+
+
+def number_of_connected_neighbours_array(neighbour_array: np.ndarray):
+    return NUMBER_OF_CONNECTED_NEIGHBOURS[neighbour_array]
+
+
+def number_of_side_neighbours_array(neighbour_array: np.ndarray):
+    return NUMBER_OF_SIDE_NEIGHBOURS[neighbour_array]
+
+
+def number_of_diagonal_neighbours_array(neighbour_array: np.ndarray):
+    return NUMBER_OF_DIAGONAL_NEIGHBOURS[neighbour_array]
+
+
+def is_top_left_corner_of_square_array(neighbour_array: np.ndarray):
+    return IS_TOP_LEFT_CORNER_OF_SQUARE[neighbour_array]
+
+
+def number_of_second_neighbours_array(second_neighbour_array: np.ndarray):
+    return NUMBER_OF_SECOND_NEIGHBOURS[second_neighbour_array]
+
+
+def number_of_connected_second_neighbours_array(second_neighbour_array: np.ndarray):
+    return NUMBER_OF_CONNECTED_SECOND_NEIGHBOURS[second_neighbour_array]
+
+
 def get_neighbour_array_no_hang(array: np.ndarray):
     out = get_neighbour_array(array)
     out[array == 0] = 0
@@ -75,19 +140,13 @@ def _array_to_binary_wrapper(func):
 
 @_array_to_binary_wrapper
 def number_of_neighbours(n):
-    return _number_of_bits_high(n)
+    return int(NUMBER_OF_NEIGHBOURS[n])
 
 
 def number_of_second_neighbours(arr: np.ndarray):
     assert arr.shape == (5, 5)
 
-    mask = np.array([[1, 1, 1, 1, 1],
-                     [1, 0, 0, 0, 1],
-                     [1, 0, 0, 0, 1],
-                     [1, 0, 0, 0, 1],
-                     [1, 1, 1, 1, 1]])
-
-    return np.count_nonzero(mask & arr)
+    return int(NUMBER_OF_SECOND_NEIGHBOURS[second_neighbours_array_to_binary(arr != 0)])
 
 
 def _number_of_bits_high(b: int):
@@ -96,12 +155,12 @@ def _number_of_bits_high(b: int):
 
 @_array_to_binary_wrapper
 def number_of_connected_neighbours(b):
-    return _number_of_01_patterns_in_ordered_neighbours_set(b)
+    return int(NUMBER_OF_CONNECTED_NEIGHBOURS[b])
 
 
 @_array_to_binary_wrapper
 def number_of_connected_second_neighbours(b):
-    return _number_of_01_patterns_in_ordered_second_neighbours_set(b)
+    return int(NUMBER_OF_CONNECTED_SECOND_NEIGHBOURS[b])
 
 
 def _number_of_01_patterns_in_ordered_neighbours_set(b: int):
@@ -136,22 +195,30 @@ def _number_of_01_patterns_in_ordered_second_neighbours_set(b):
     return cnt
 
 
+def _connected_patterns(codes: np.ndarray, n_bits: int):
+    # Number of 0 to 1 transitions around the ordered, circular set of bits of each code, as counted by
+    # _number_of_01_patterns_in_ordered_neighbours_set.
+
+    count = np.zeros(codes.shape, dtype=np.uint8)
+    for i in range(n_bits):
+        count += ((codes >> i) & 1 == 1) & ((codes >> ((i + 1) % n_bits)) & 1 == 0)
+
+    return count
+
+
 @_array_to_binary_wrapper
 def is_top_left_corner_of_square(b):
-    mask = 0b00011100
-    return mask & b == mask
+    return bool(IS_TOP_LEFT_CORNER_OF_SQUARE[b])
 
 
 @_array_to_binary_wrapper
 def number_of_side_neighbours(b):
-    mask = 0b01010101
-    return bin(mask & b).count('1')
+    return int(NUMBER_OF_SIDE_NEIGHBOURS[b])
 
 
 @_array_to_binary_wrapper
 def number_of_diagonal_neighbours(b):
-    mask = 0b10101010
-    return bin(mask & b).count('1')
+    return int(NUMBER_OF_DIAGONAL_NEIGHBOURS[b])
 
 
 @_array_to_binary_wrapper
@@ -161,6 +228,10 @@ def neighbour_coordinates(b):
 
 @_array_to_binary_wrapper
 def side_neighbour_coordinates(b):
+    return set(SIDE_NEIGHBOUR_COORDINATES[b])
+
+
+def _side_neighbour_coordinates(b: int):
     coords = set()
 
     if b & 0b00000001:
@@ -177,6 +248,10 @@ def side_neighbour_coordinates(b):
 
 @_array_to_binary_wrapper
 def diagonal_neighbour_coordinates(b):
+    return set(DIAGONAL_NEIGHBOUR_COORDINATES[b])
+
+
+def _diagonal_neighbour_coordinates(b: int):
     coords = set()
 
     if b & 0b00000010:
@@ -205,3 +280,20 @@ def relative_neighbour_binary(points: np.ndarray, neighbours: np.ndarray):
 
 def array_point_to_binary(points: np.ndarray):
     return NEIGHBOUR_REF[tuple((points + (1, 1)).transpose())]
+
+
+# Each predicate of a neighbour code, tabulated for every code.  Indexing a table with an array of codes, such as
+# get_neighbour_array or get_second_neighbour_array gives, applies the predicate to every pixel at once.
+_CODES = np.arange(256)
+_SECOND_CODES = np.arange(2 ** 16)
+
+NUMBER_OF_NEIGHBOURS = np.array([_number_of_bits_high(b) for b in range(256)], dtype=np.uint8)
+NUMBER_OF_SIDE_NEIGHBOURS = NUMBER_OF_NEIGHBOURS[_CODES & 0b01010101]
+NUMBER_OF_DIAGONAL_NEIGHBOURS = NUMBER_OF_NEIGHBOURS[_CODES & 0b10101010]
+NUMBER_OF_CONNECTED_NEIGHBOURS = _connected_patterns(_CODES, 8)
+IS_TOP_LEFT_CORNER_OF_SQUARE = _CODES & 0b00011100 == 0b00011100
+SIDE_NEIGHBOUR_COORDINATES = [frozenset(_side_neighbour_coordinates(b)) for b in range(256)]
+DIAGONAL_NEIGHBOUR_COORDINATES = [frozenset(_diagonal_neighbour_coordinates(b)) for b in range(256)]
+
+NUMBER_OF_SECOND_NEIGHBOURS = NUMBER_OF_NEIGHBOURS[_SECOND_CODES & 0xff] + NUMBER_OF_NEIGHBOURS[_SECOND_CODES >> 8]
+NUMBER_OF_CONNECTED_SECOND_NEIGHBOURS = _connected_patterns(_SECOND_CODES, 16)
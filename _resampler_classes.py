@@ -0,0 +1,119 @@
+import numpy as np
+
+from abc import ABCMeta, abstractmethod
+
+
+class ResamplerInterface(metaclass=ABCMeta):
+    @abstractmethod
+    def start(self, state, resampling_factor: float):
+        pass
+
+    @abstractmethod
+    def resume(self, state, resampling_factor: float, iteration: int):
+        pass
+
+    @abstractmethod
+    def next_step(self, state):
+        pass
+
+    @abstractmethod
+    def is_time_to_resample(self):
+        pass
+
+
+class IterativeECSFResampler(ResamplerInterface):
+    def __init__(self, resample_iterative_interval: int = 1):
+        self.resample_iterative_interval = resample_iterative_interval
+        self.resampling_factor = None
+        self.curr_interval = 0
+        self.resample_count = 0
+        self.skip_count = 0
+
+    def start(self, state, resampling_factor: float):
+        self.resume(state, resampling_factor, 0)
+
+    def resume(self, state, resampling_factor: float, iteration: int):
+        # Resampling keeps its interval from the start of the flow.  The counts cover only the steps from here.
+
+        self.resampling_factor = resampling_factor
+        self.curr_interval = iteration
+        self.resample_count = 0
+        self.skip_count = 0
+
+    def next_step(self, state):
+        # The step just taken is counted as resampled or skipped.
+
+        if self.is_time_to_resample():
+            self.resample_count += 1
+        else:
+            self.skip_count += 1
+        self.curr_interval += 1
+
+    def is_time_to_resample(self):
+        return not (self.curr_interval % self.resample_iterative_interval)
+
+
+class UniformityECSFResampler(ResamplerInterface):
+    """
+    Resamples the curve only once its vertex spacing has drifted from uniform.
+
+    The metrics come from the edge lengths of the current state, so deciding costs a few reductions rather than a
+    resample.  The curve is resampled when any edge is much shorter or longer than the mean edge, when the edge lengths
+    vary too much, or when the vertex count has drifted from that which the resampling factor gives for the current
+    length, as it does while the curve shortens without resampling.  The filters of the flow are sized in vertices, so
+    the vertex count is held close to that of resampling every step.
+
+    :param min_edge_ratio: Smallest permitted ratio of the shortest edge to the mean edge.
+    :param max_edge_ratio: Largest permitted ratio of the longest edge to the mean edge.
+    :param max_variation: Largest permitted coefficient of variation of the edge lengths.
+    :param max_density_change: Largest permitted relative difference between the vertex count and the vertex count
+    after resampling.
+    """
+    def __init__(self, min_edge_ratio: float = 0.8,
+                 max_edge_ratio: float = 1.25,
+                 max_variation: float = 0.1,
+                 max_density_change: float = 0.002):
+        self.min_edge_ratio = min_edge_ratio
+        self.max_edge_ratio = max_edge_ratio
+        self.max_variation = max_variation
+        self.max_density_change = max_density_change
+        self.resampling_factor = None
+        self.resample_count = 0
+        self.skip_count = 0
+        self._is_time = True
+
+    def start(self, state, resampling_factor: float):
+        self.resampling_factor = resampling_factor
+        self.resample_count = 0
+        self.skip_count = 0
+        self._is_time = self._is_non_uniform(state)
+
+    def resume(self, state, resampling_factor: float, iteration: int):
+        # The decision depends only on the current curve.  The counts cover only the steps from here.
+
+        self.start(state, resampling_factor)
+
+    def next_step(self, state):
+        # The step just taken is counted as resampled or skipped.
+
+        if self._is_time:
+            self.resample_count += 1
+        else:
+            self.skip_count += 1
+        self._is_time = self._is_non_uniform(state)
+
+    def is_time_to_resample(self):
+        return self._is_time
+
+    def _is_non_uniform(self, state):
+        edge_lengths = state.edge_lengths
+        n = edge_lengths.shape[0]
+        mean_edge_length = state.total_length / n
+
+        if not mean_edge_length > 0:
+            return True
+
+        return (edge_lengths.min() < self.min_edge_ratio * mean_edge_length
+                or edge_lengths.max() > self.max_edge_ratio * mean_edge_length
+                or np.std(edge_lengths) > self.max_variation * mean_edge_length
+                or abs(n - self.resampling_factor * state.total_length) > self.max_density_change * n)
@@ -1,48 +1,154 @@
 import time
+import numpy as np
+
 from abc import ABCMeta, abstractmethod
+from typing import NamedTuple, Sequence
+
+
+class SavedCurve(NamedTuple):
+    iteration: int
+    curve: np.ndarray
+    area: float
+    length: float
+    concavity: float
 
 
 class SaverInterface(metaclass=ABCMeta):
     @abstractmethod
-    def start(self):
+    def start(self, state):
         pass
 
     @abstractmethod
-    def next_step(self):
+    def next_step(self, state):
         pass
 
     @abstractmethod
     def is_time_to_save(self):
         pass
 
+    @abstractmethod
+    def saved_curves(self, state):
+        # Curves to save once it is time to save, given the CurveState of the current iterate.
+        pass
+
+    @abstractmethod
+    def resume(self, state, iteration: int, saved_count: int):
+        # Continue from the CurveState of a checkpoint taken at the given iteration, after saved_count saves.
+        pass
+
+
+def _saved_curve(iteration: int, state, curve: np.ndarray):
+    return SavedCurve(iteration, curve, state.enclosed_area(), state.total_length, state.concavity)
+
 
 class IterativeECSFSaver(SaverInterface):
     def __init__(self, save_iterative_interval: int):
         self.save_iterative_interval = save_iterative_interval
         self.curr_interval = 0
 
-    def start(self):
+    def start(self, state):
         self.curr_interval = 0
 
-    def next_step(self):
+    def next_step(self, state):
         self.curr_interval += 1
 
     def is_time_to_save(self):
         return not (self.curr_interval % self.save_iterative_interval)
 
+    def saved_curves(self, state):
+        return [_saved_curve(self.curr_interval, state, state.curve.copy())]
+
+    def resume(self, state, iteration: int, saved_count: int):
+        self.curr_interval = iteration
+
 
 class TimeECSFSaver(SaverInterface):
     def __init__(self, save_time_interval: float):
         self.save_time_interval = save_time_interval
         self.start_time = time.time()
         self.curr_time = time.time()
+        self.curr_iteration = 0
 
-    def start(self):
+    def start(self, state):
         self.start_time = time.time()
         self.curr_time = time.time()
+        self.curr_iteration = 0
 
-    def next_step(self):
+    def next_step(self, state):
         self.curr_time = time.time()
+        self.curr_iteration += 1
 
     def is_time_to_save(self):
         return not ((self.curr_time - self.start_time) % self.save_time_interval)
+
+    def saved_curves(self, state):
+        return [_saved_curve(self.curr_iteration, state, state.curve.copy())]
+
+    def resume(self, state, iteration: int, saved_count: int):
+        self.start(state)
+        self.curr_iteration = iteration
+
+
+class AreaECSFSaver(SaverInterface):
+    """
+    Saves the flow as its enclosed area falls through each of a set of target areas.
+
+    At each target, the saved curve is whichever of the two iterates either side of the target has the closer area,
+    so at most one curve is kept per target and no selection is needed after the flow.
+
+    :param target_areas: Enclosed areas at which to save a curve.
+    """
+    def __init__(self, target_areas: Sequence[float]):
+        self.target_areas = np.sort(np.asarray(target_areas, dtype=float))[::-1]
+        self.next_target = 0
+        self.curr_iteration = 0
+        self._prev = None
+        self._curr = None
+        self._buffers = [np.empty((0, 2)), np.empty((0, 2))]
+
+    def start(self, state):
+        self.resume(state, 0, 0)
+
+    def resume(self, state, iteration: int, saved_count: int):
+        # One curve is saved per target, so saved_count targets have been passed.
+        # The iterate before the checkpoint is not kept, so the first target after resuming takes the current curve.
+
+        self.next_target = saved_count
+        self.curr_iteration = iteration
+        self._prev = None
+        self._curr = self._record(state)
+
+    def next_step(self, state):
+        self.curr_iteration += 1
+        self._prev = self._curr
+        self._curr = self._record(state)
+
+    def is_time_to_save(self):
+        return self.next_target < self.target_areas.shape[0] and self._curr.area <= self.target_areas[self.next_target]
+
+    def saved_curves(self, state):
+        # One curve for every target passed since the last call.
+
+        saved_curves = []
+        while self.is_time_to_save():
+            target = self.target_areas[self.next_target]
+            nearest = self._curr
+            if self._prev is not None and abs(self._prev.area - target) < abs(self._curr.area - target):
+                nearest = self._prev
+
+            saved_curves.append(nearest._replace(curve=nearest.curve.copy()))
+            self.next_target += 1
+
+        return saved_curves
+
+    def _record(self, state):
+        # Keep the current iterate in whichever of two buffers does not hold the previous one.
+
+        buffer = self._buffers[self.curr_iteration % 2]
+        n = state.curve.shape[0]
+        if buffer.shape[0] < n:
+            buffer = np.empty((n, 2))
+            self._buffers[self.curr_iteration % 2] = buffer
+        np.copyto(buffer[:n], state.curve)
+
+        return _saved_curve(self.curr_iteration, state, buffer[:n])
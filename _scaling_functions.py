@@ -1,5 +1,8 @@
 import numpy as np
 
+# Largest table built by f_tabulated to meet its max_error.
+MAX_TABULATED_RESOLUTION = 2 ** 20 + 1
+
 
 def f_elu(alpha, a):
     '''
@@ -55,3 +58,87 @@ def f_sigmoid(alpha, a):
         return 1 / (1 + np.exp(-alpha * (x - a)))
 
     return _sigmoid
+
+
+def f_tabulated(function, lower=-1, upper=1, max_error=1e-4, resolution=None, clip=False):
+    '''
+    Tabulated function constructor.  Returns a function that interpolates the value of the given function in a table
+    instead of evaluating it.
+
+    The table holds the function at equally spaced points between lower and upper, and each input takes the value
+    linearly interpolated between its neighbouring points.  The error of linear interpolation falls with the square of
+    the spacing, so small tables meet tight bounds.  Unless the resolution is given, points are added until every input
+    between lower and upper is within max_error of the function, checked halfway between neighbouring points.
+
+    Each lookup costs the same few array operations whatever the function, so the table pays off for functions that
+    cost more than that to evaluate.  The built-in functions are single vectorised expressions and are about as fast.
+
+    The returned function takes an optional out array, into which the values are written.  Inputs outside the table
+    are evaluated with the function, or with clip set, take the value at the nearer end of the table.  f_sigmoid(alpha,
+    a) is constant outside -10 / alpha and 10 / alpha, so clipping it to those bounds loses nothing.
+
+    :param function: Scaling function, such as one returned by f_sigmoid, f_elu or f_softplus.
+    :param lower: Smallest input in the table.
+    :param upper: Largest input in the table.
+    :param max_error: Largest difference from the function for inputs between lower and upper.
+    :param resolution: Number of points in the table, at least 2.  If given, max_error is not checked.
+    :param clip: Take inputs outside the table from its ends instead of evaluating the function.
+    :return: Tabulated function, taking x and an optional out array.
+    :raises ValueError: If no table of up to MAX_TABULATED_RESOLUTION points is within max_error of the function.
+    '''
+
+    if resolution is None:
+        resolution = 257
+        while True:
+            # Values at the points of the table and halfway between them, where linear interpolation gives the mean of
+            # the neighbouring points.
+            values = function(np.linspace(lower, upper, 2 * resolution - 1))
+            error = np.max(np.abs(values[1::2] - 0.5 * (values[:-2:2] + values[2::2])), initial=0)
+            if error <= max_error:
+                table = values[::2]
+                break
+            if resolution >= MAX_TABULATED_RESOLUTION:
+                raise ValueError(f"No table of up to {MAX_TABULATED_RESOLUTION} points is within {max_error} of the "
+                                 f"function, whose error is {error}.")
+            resolution = 2 * resolution - 1
+    else:
+        if resolution < 2:
+            raise ValueError(f"A table needs at least 2 points, not {resolution}.")
+        table = function(np.linspace(lower, upper, resolution))
+
+    slopes = np.diff(table)
+    scale = (resolution - 1) / (upper - lower)
+
+    def _tabulated(x, out=None):
+        x = np.asarray(x, dtype=float)
+        if out is None:
+            out = np.empty_like(x)
+        if not x.size:
+            return out
+
+        # min and max are NaN if any input is, so a NaN input also takes the slower path.
+        smallest, largest = x.min(), x.max()
+        if clip:
+            outside = None if smallest == smallest else np.isnan(x)
+        else:
+            outside = None if smallest >= lower and largest <= upper else ~((x >= lower) & (x <= upper))
+
+        # Position in the table, split into the index of the point below and the fraction of the way to the next.
+        np.subtract(x, lower, out=out)
+        np.multiply(out, scale, out=out)
+        np.clip(out, 0, resolution - 1, out=out)
+        if outside is not None:
+            out[outside] = 0
+        index = out.astype(np.intp)
+        np.minimum(index, resolution - 2, out=index)
+
+        np.subtract(out, index, out=out)
+        np.multiply(out, np.take(slopes, index), out=out)
+        np.add(out, np.take(table, index), out=out)
+
+        if outside is not None:
+            out[outside] = function(x[outside])
+
+        return out
+
+    return _tabulated
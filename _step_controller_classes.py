@@ -0,0 +1,72 @@
+import numpy as np
+
+from abc import ABCMeta, abstractmethod
+
+# Default bounds of DisplacementECSFStepController.
+MAX_EDGE_FRACTION = 0.25
+MAX_CURVATURE_FRACTION = 0.05
+MIN_STEP_SIZE = 0.01
+MAX_STEP_SIZE = 5
+
+
+class StepControllerInterface(metaclass=ABCMeta):
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def next_step(self, state, unit_step_vector: np.ndarray):
+        pass
+
+
+class DisplacementECSFStepController(StepControllerInterface):
+    """
+    Chooses the step size of each iteration from the displacement of the curve at unit step size.
+
+    The step is bounded so that no vertex moves further than a fraction of the mean edge length, nor further than a
+    fraction of the radius of curvature of its part of the curve, in the manner of a CFL condition.  The step shrinks
+    immediately when a bound tightens, near tight concavities and sharp tips, and grows by at most a fixed factor per
+    iteration as the curve smooths.  The step size of every iteration is kept in step_sizes.
+
+    :param max_edge_fraction: Largest displacement of any vertex, as a fraction of the mean edge length.
+    :param max_curvature_fraction: Largest displacement of any convex vertex, as a fraction of its radius of curvature.
+    :param min_step_size: Smallest step size, taken when the bounds would go below it.
+    :param max_step_size: Largest step size.
+    :param growth: Largest factor by which the step size may grow from one iteration to the next.
+    """
+    def __init__(self, max_edge_fraction: float = MAX_EDGE_FRACTION,
+                 max_curvature_fraction: float = MAX_CURVATURE_FRACTION,
+                 min_step_size: float = MIN_STEP_SIZE,
+                 max_step_size: float = MAX_STEP_SIZE,
+                 growth: float = 1.1):
+        self.max_edge_fraction = max_edge_fraction
+        self.max_curvature_fraction = max_curvature_fraction
+        self.min_step_size = min_step_size
+        self.max_step_size = max_step_size
+        self.growth = growth
+        self.step_sizes = []
+
+    def start(self):
+        self.step_sizes = []
+
+    def next_step(self, state, unit_step_vector: np.ndarray):
+        displacement = np.sqrt(unit_step_vector[:, 0] ** 2 + unit_step_vector[:, 1] ** 2)
+
+        step_size = self.max_step_size
+        if self.step_sizes:
+            step_size = min(step_size, self.growth * self.step_sizes[-1])
+
+        max_displacement = displacement.max(initial=0)
+        if max_displacement > 0:
+            mean_edge_length = state.total_length / state.curve.shape[0]
+            step_size = min(step_size, self.max_edge_fraction * mean_edge_length / max_displacement)
+
+        # Convex vertices move toward their centre of curvature, and overshoot it by moving further than its radius.
+        max_turning = np.nanmax(displacement * np.fmax(state.curvature, 0), initial=0)
+        if max_turning > 0:
+            step_size = min(step_size, self.max_curvature_fraction / max_turning)
+
+        step_size = max(step_size, self.min_step_size)
+        self.step_sizes.append(step_size)
+
+        return step_size
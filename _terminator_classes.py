@@ -1,3 +1,4 @@
+import threading
 import time
 from abc import ABCMeta, abstractmethod
 
@@ -41,6 +42,9 @@ class TimeECSFTerminator(TerminatorInterface):
         self.start_time = time.time()
         self.curr_time = time.time()
 
+    def next_step(self):
+        self.curr_time = time.time()
+
     def is_finished(self):
         return time.time() - self.start_time >= self.max_time
 
@@ -57,4 +61,18 @@ class ConditionalECSFTerminator(TerminatorInterface):
         self.curr_concavity = curr_concavity
 
     def is_finished(self):
-        return self.curr_concavity <= self.concavity_threshold
\ No newline at end of file
+        return self.curr_concavity <= self.concavity_threshold
+
+
+class EventECSFTerminator(TerminatorInterface):
+    def __init__(self, event=None):
+        self.event = threading.Event() if event is None else event
+
+    def start(self):
+        pass
+
+    def next_step(self):
+        pass
+
+    def is_finished(self):
+        return self.event.is_set()
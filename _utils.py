@@ -1,16 +1,217 @@
 import numpy as np
-from scipy import ndimage, interpolate
 
 import _vector_maths
+import _workspace
 
+# Direct convolution costs O(N * kernel width) and the spectral filter O(N log N).
+# The spectral filter is used when the kernel is wider than this multiple of log2(N).
+SPECTRAL_KERNEL_WIDTH_RATIO = 8
 
-def gaussian_filter(curve: np.ndarray, sigma: float):
-    return ndimage.gaussian_filter1d(curve, sigma, axis=0, mode='wrap')
+GAUSSIAN_TRUNCATE = 4.0
 
+# Below this sigma the number of aliases summed for the transfer function grows as 1 / sigma, while the sampled
+# kernel is only a few vertices wide, so its transform is taken directly instead.
+MIN_ALIASED_SIGMA = 0.5
 
-def resample(curve: np.ndarray, factor: float):
+
+def gaussian_filter(curve: np.ndarray, sigma: float, output: np.ndarray = None, method: str = 'auto'):
+    # Periodic Gaussian filter along the curve.
+    # method is 'direct' (convolution with the truncated kernel), 'spectral' (multiplication in the frequency
+    # domain) or 'auto', which picks the cheaper of the two for the given sigma and number of vertices.
+    # Both give the same result up to floating point error.
+
+    if method == 'auto':
+        method = 'spectral' if _is_spectral_cheaper(sigma, curve.shape[0]) else 'direct'
+
+    if method == 'direct':
+        # scipy.ndimage is slow to import, and only needed once a curve is filtered.
+        from scipy import ndimage
+
+        return ndimage.gaussian_filter1d(curve, sigma, axis=0, output=output, mode='wrap', truncate=GAUSSIAN_TRUNCATE)
+    elif method == 'spectral':
+        return spectral_gaussian_filter(curve, sigma, output)
+    else:
+        raise ValueError(f"Unknown Gaussian filter method '{method}'.")
+
+
+def spectral_gaussian_filter(curve: np.ndarray, sigma: float, output: np.ndarray = None):
+    # Circular convolution with the wrapped Gaussian kernel, computed as a product of real FFTs.
+
+    n = curve.shape[0]
+    filtered = np.fft.irfft(np.fft.rfft(curve, axis=0) * gaussian_transfer_function(sigma, n)[:, None],
+                            n=n, axis=0)
+
+    if output is None:
+        return filtered
+
+    output[...] = filtered
+    return output
+
+
+def gaussian_scale_space(curve: np.ndarray, sigmas: np.ndarray, truncated: bool = True):
+    # Periodic Gaussian filter of the curve at every sigma, from a single FFT of the curve.
+    # Every scale is a multiplication of the same spectrum by a Gaussian transfer function.  These are of the kernel
+    # truncated at GAUSSIAN_TRUNCATE sigmas, so each scale matches gaussian_filter to rounding, or if not truncated,
+    # of the closed-form untruncated kernel.
+    # Returns a len(sigmas)xNx2 array.  A sigma of zero returns the curve unchanged.
+
+    n = curve.shape[0]
+    sigmas = np.asarray(sigmas, dtype=float)
+    is_filtered = sigmas > 0
+
+    transfer_functions = np.ones((sigmas.shape[0], n // 2 + 1))
+    if is_filtered.any():
+        if truncated:
+            transfer_functions[is_filtered] = gaussian_transfer_functions(sigmas[is_filtered], n)
+        else:
+            transfer_functions[is_filtered] = untruncated_gaussian_transfer_functions(sigmas[is_filtered], n)
+
+    curves = np.fft.irfft(transfer_functions[:, :, None] * np.fft.rfft(curve, axis=0)[None], n=n, axis=1)
+    curves[~is_filtered] = curve
+
+    return curves
+
+
+def untruncated_gaussian_transfer_functions(sigmas: np.ndarray, n: int):
+    # Transfer functions of the untruncated, sampled Gaussian on a periodic curve of n vertices, one row per sigma.
+    # By the Poisson summation formula, the transform of the sampled Gaussian is the continuous transform
+    # exp(-2 pi^2 sigma^2 f^2) summed over its aliases f + m.  Rows are normalised to unit gain at f = 0.
+    # Differs from gaussian_transfer_functions only by the kernel mass beyond GAUSSIAN_TRUNCATE sigmas.
+
+    sigmas = np.asarray(sigmas, dtype=float)
+    frequencies = np.arange(n // 2 + 1) / n
+    transfer_functions = np.zeros((sigmas.shape[0], frequencies.shape[0]))
+
+    is_narrow = sigmas < MIN_ALIASED_SIGMA
+    for i in np.flatnonzero(is_narrow):
+        transfer_functions[i] = _sampled_gaussian_transfer_function(sigmas[i], n)
+
+    if is_narrow.all():
+        return transfer_functions
+
+    # Aliases up to |m| contribute until exp(-2 pi^2 sigma^2 m^2) falls below double precision.
+    wide_sigmas = sigmas[~is_narrow][:, None]
+    max_alias = int(np.ceil(np.sqrt(-np.log(np.finfo(float).eps) / (2 * np.pi ** 2 * wide_sigmas.min() ** 2)))) + 1
+
+    wide_transfer_functions = np.zeros((wide_sigmas.shape[0], frequencies.shape[0]))
+    for m in range(-max_alias, max_alias + 1):
+        wide_transfer_functions += np.exp(-2 * np.pi ** 2 * wide_sigmas ** 2 * (frequencies + m) ** 2)
+    transfer_functions[~is_narrow] = wide_transfer_functions / wide_transfer_functions[:, :1]
+
+    return transfer_functions
+
+
+def _sampled_gaussian_transfer_function(sigma: float, n: int):
+    # Real FFT of the sampled Gaussian, wrapped onto a periodic curve of n vertices, out to where it falls below
+    # double precision.  Equal to the alias sum of untruncated_gaussian_transfer_functions.
+
+    radius = int(np.ceil(np.sqrt(-2 * np.log(np.finfo(float).eps)) * sigma))
+    x = np.arange(-radius, radius + 1)
+    with np.errstate(over='ignore'):
+        kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    return np.fft.rfft(np.bincount(x % n, weights=kernel, minlength=n)).real
+
+
+def gaussian_transfer_function(sigma: float, n: int):
+    # Real FFT of the Gaussian kernel of scipy.ndimage.gaussian_filter1d, wrapped onto a periodic curve of n
+    # vertices.  Kernels wider than the curve wrap around more than once.
+    # The kernel is symmetric, so its transform is real.
+
+    return np.fft.rfft(_wrapped_gaussian_kernel(sigma, n)).real
+
+
+def gaussian_transfer_functions(sigmas: np.ndarray, n: int):
+    # gaussian_transfer_function of every sigma, one row per sigma, from a single real FFT of all of the kernels.
+
+    return np.fft.rfft(np.stack([_wrapped_gaussian_kernel(sigma, n) for sigma in sigmas]), axis=1).real
+
+
+def _wrapped_gaussian_kernel(sigma: float, n: int):
+    radius = int(GAUSSIAN_TRUNCATE * sigma + 0.5)
+    if radius == 0:
+        # A kernel of one vertex is an impulse, however small sigma is.
+        impulse = np.zeros(n)
+        impulse[0] = 1
+        return impulse
+
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 / (sigma * sigma) * x ** 2)
+    kernel /= kernel.sum()
+
+    return np.bincount(x % n, weights=kernel, minlength=n)
+
+
+def _is_spectral_cheaper(sigma: float, n: int):
+    kernel_width = 2 * int(GAUSSIAN_TRUNCATE * sigma + 0.5) + 1
+
+    return n > 1 and kernel_width > SPECTRAL_KERNEL_WIDTH_RATIO * np.log2(n)
+
+
+def resample(curve: np.ndarray, factor: float, edge_lengths: np.ndarray = None,
+             workspace: _workspace.ECSFWorkspace = None, out_name: str = 'resampled'):
     # Resample the vertices along the curve.
     # Return the same curve but with n=int(factor * curve_length) equidistant vertices.
+    # New vertices are linearly interpolated between the two vertices whose cumulative arc lengths bracket them,
+    # with the same arithmetic as scipy.interpolate.interp1d.
+    # If a workspace is given, the cumulative lengths and the result are written into its arrays.
+
+    curve = np.asarray(curve, dtype=float)
+
+    if workspace is None:
+        workspace = _workspace.ECSFWorkspace(curve.shape[0] + 1)
+    if edge_lengths is None:
+        _, edge_lengths = workspace.differences(curve, 'resample_')
+
+    n = curve.shape[0]
+
+    cumulative_lengths = workspace.array('cumulative_lengths', n + 1)
+    cumulative_lengths[0] = 0
+    np.cumsum(edge_lengths, out=cumulative_lengths[1:])
+    total_length = cumulative_lengths[-1]
+
+    m = int(factor * total_length)
+    out = workspace.array(out_name, m, 2)
+    if m == 0:
+        return out
+
+    new_lengths = workspace.array('new_lengths', m)
+    np.multiply(workspace.arange(m), total_length / m, out=new_lengths)
+
+    # Vertex n is vertex 0, closing the loop.
+    hi = workspace.array('hi', m, dtype=np.intp)
+    lo = workspace.array('lo', m, dtype=np.intp)
+    hi[:] = np.searchsorted(cumulative_lengths, new_lengths)
+    np.clip(hi, 1, n, out=hi)
+    np.subtract(hi, 1, out=lo)
+
+    x_lo = workspace.array('x_lo', m)
+    x_hi = workspace.array('x_hi', m)
+    y_lo = workspace.array('y_lo', m, 2)
+    y_hi = workspace.array('y_hi', m, 2)
+    np.take(cumulative_lengths, lo, out=x_lo, mode='clip')
+    np.take(cumulative_lengths, hi, out=x_hi, mode='clip')
+    np.take(curve, lo, axis=0, out=y_lo, mode='clip')
+    np.take(curve, hi, axis=0, out=y_hi, mode='wrap')
+
+    # slope = (y_hi - y_lo) / (x_hi - x_lo)
+    np.subtract(y_hi, y_lo, out=y_hi)
+    np.subtract(x_hi, x_lo, out=x_hi)
+    np.divide(y_hi, x_hi[:, None], out=y_hi)
+
+    # y = slope * (x - x_lo) + y_lo
+    np.subtract(new_lengths, x_lo, out=x_lo)
+    np.multiply(y_hi, x_lo[:, None], out=out)
+    np.add(out, y_lo, out=out)
+
+    return out
+
+
+def _interp1d_resample(curve: np.ndarray, factor: float):
+    # Reference implementation of resample, as it was with scipy.interpolate.interp1d, for its tests and benchmark.
+
+    from scipy import interpolate
 
     current_lengths = _vector_maths.edge_length(curve)
     curve_looped = np.vstack((curve, curve[0]))
@@ -20,4 +221,4 @@ def resample(curve: np.ndarray, factor: float):
     interp_func = interpolate.interp1d(cumulative_lengths_zero_start, curve_looped, axis=0)
     new_lengths = np.linspace(0, total_length, int(factor * total_length), endpoint=False)
 
-    return interp_func(new_lengths)
\ No newline at end of file
+    return interp_func(new_lengths)
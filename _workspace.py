@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class ECSFWorkspace:
+    """
+    Reusable scratch arrays for the enclosed curve shortening flow.
+
+    Arrays are requested by name and length, and the same memory is handed back on every request, so that
+    successive iterations write each stage of the step with out= arguments instead of allocating new arrays.
+    An array is only reallocated if a longer one than its current capacity is requested.
+
+    :param capacity: Initial number of rows allocated for each named array.
+    """
+    def __init__(self, capacity: int = 0):
+        self.capacity = capacity
+        self._arrays = {}
+
+    def array(self, name: str, n: int, width: int = None, dtype=float):
+        # Returns a view of the first n rows of the named array.
+        # Contents are whatever was last written to them.
+
+        arr = self._arrays.get(name)
+        if arr is None or arr.shape[0] < n:
+            self.capacity = max(self.capacity, n)
+            shape = (self.capacity,) if width is None else (self.capacity, width)
+            arr = np.empty(shape, dtype=dtype)
+            self._arrays[name] = arr
+
+        return arr[:n]
+
+    def arange(self, n: int):
+        # Returns [0, 1, ..., n-1] as floats without allocating on repeated calls.
+
+        arr = self._arrays.get('arange')
+        if arr is None or arr.shape[0] < n:
+            self.capacity = max(self.capacity, n)
+            arr = np.arange(self.capacity, dtype=float)
+            self._arrays['arange'] = arr
+
+        return arr[:n]
+
+    def differences(self, curve: np.ndarray, prefix: str = ''):
+        # Vector from each vertex's predecessor to the vertex, and its length.
+        # Equivalent to curve - np.roll(curve, 1, axis=0) and its row norms.
+
+        n = curve.shape[0]
+        difference = self.array(prefix + 'difference', n, 2)
+        edge_lengths = self.array(prefix + 'edge_lengths', n)
+        squared = self.array(prefix + 'squared_difference', n, 2)
+
+        np.subtract(curve[1:], curve[:-1], out=difference[1:])
+        np.subtract(curve[0], curve[-1], out=difference[0])
+
+        np.multiply(difference, difference, out=squared)
+        np.add(squared[:, 0], squared[:, 1], out=edge_lengths)
+        np.sqrt(edge_lengths, out=edge_lengths)
+
+        return difference, edge_lengths
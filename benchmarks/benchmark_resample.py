@@ -0,0 +1,52 @@
+"""
+Benchmark _utils.resample against the previous scipy.interpolate.interp1d implementation.
+
+Outlines are extracted from every image in lib/silhouettes and resampled at the factor used by
+ConcaveEnclosedCSFList (the initial vertex count over the initial length), so that the timings reflect one
+resampling step of the concave flow.
+
+Usage: python benchmarks/benchmark_resample.py [repeats]
+"""
+import glob
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import _image_curve
+import _image_processing
+import _utils
+import _vector_maths
+
+SILHOUETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'lib', 'silhouettes')
+
+
+def silhouette_curves():
+    for filename in sorted(glob.glob(os.path.join(SILHOUETTE_DIR, '*', '*'))):
+        im = _image_processing.load_image(filename)
+        if im is None:
+            continue
+        yield os.path.basename(filename), _image_curve.ImageCurve(im).curve().astype(float)
+
+
+def main(repeats: int = 50):
+    print(f"{'silhouette':45s}{'vertices':>10s}{'interp1d (us)':>16s}{'resample (us)':>16s}{'speedup':>10s}")
+
+    for name, curve in silhouette_curves():
+        factor = curve.shape[0] / _vector_maths.edge_length(curve).sum()
+
+        assert np.array_equal(_utils.resample(curve, factor), _utils._interp1d_resample(curve, factor))
+
+        t_interp1d = min(timeit.repeat(lambda: _utils._interp1d_resample(curve, factor),
+                                       number=repeats, repeat=3)) / repeats
+        t_resample = min(timeit.repeat(lambda: _utils.resample(curve, factor), number=repeats, repeat=3)) / repeats
+
+        print(f"{name:45s}{curve.shape[0]:10d}{1e6 * t_interp1d:16.1f}{1e6 * t_resample:16.1f}"
+              f"{t_interp1d / t_resample:10.2f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""
+Benchmark the iterations of ConcaveEnclosedCSFList from the pixel outline of ImageCurve.curve() against the sub-pixel
+outlines of ImageCurve.subpixel_curve().
+
+Outlines are extracted from every image in lib/silhouettes whose name contains the given pattern, padded as in
+enclosed_csf_list.  Sub-pixel outlines are given the mean vertex spacing of the pixel outline, so that both flows
+filter over the same length of curve.  As in enclosed_csf_list_retry_on_fail, a flow that fails is run again with the
+step size reduced by a factor of 5, up to 4 attempts.
+
+Usage: python benchmarks/benchmark_subpixel_curve.py [pattern] [max_iterations]
+"""
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import _concave_enclosed_csf_list
+import _curve_state
+import _image_curve
+import _image_processing
+import _vector_maths
+
+SILHOUETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'lib', 'silhouettes')
+SIGMAS = [0, 1]
+
+
+def silhouette_image_curves(pattern: str):
+    for filename in sorted(glob.glob(os.path.join(SILHOUETTE_DIR, '*', f'*{pattern}*'))):
+        im = _image_processing.load_image(filename)
+        if im is None:
+            continue
+        yield os.path.basename(filename), _image_curve.ImageCurve(np.pad(im, 10))
+
+
+def flow(curve: np.ndarray, max_iterations: int):
+    # Step size, iterations and seconds of the first flow to finish, or None for each if all fail.
+
+    step_size = 1
+    for _ in range(4):
+        ecsf_obj = _concave_enclosed_csf_list.ConcaveEnclosedCSFList(curve, step_size=step_size,
+                                                                     max_iterations=max_iterations)
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                ecsf_obj.run()
+        except Exception:
+            step_size /= 5
+            continue
+
+        return step_size, ecsf_obj.iterative_terminator.curr_iterations, time.perf_counter() - start
+
+    return None, None, None
+
+
+def main(pattern: str = '', max_iterations: int = 10000):
+    print(f"{'silhouette':40s}{'outline':>12s}{'vertices':>10s}{'concavity':>11s}{'step':>7s}{'iterations':>12s}"
+          f"{'seconds':>9s}")
+
+    for name, image_curve in silhouette_image_curves(pattern):
+        curve = image_curve.curve().astype(float)
+        spacing = _vector_maths.edge_length(curve).sum() / curve.shape[0]
+
+        outlines = [('pixel', curve)]
+        outlines += [(f'sigma {sigma:g}', image_curve.subpixel_curve(spacing, sigma)) for sigma in SIGMAS]
+
+        for outline_name, outline in outlines:
+            step_size, iterations, seconds = flow(outline, max_iterations)
+            concavity = _curve_state.CurveState(outline).concavity
+            if step_size is None:
+                result = f"{'failed':>28s}"
+            else:
+                result = f"{step_size:7g}{iterations:12d}{seconds:9.2f}"
+
+            print(f"{name:40s}{outline_name:>12s}{outline.shape[0]:10d}{concavity:11.1f}{result}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:]))
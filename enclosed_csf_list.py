@@ -1,16 +1,30 @@
+import concurrent.futures
+import contextlib
 import logging
+import multiprocessing
+import threading
+import time
 
 import numpy as np
-import skgeom
 
-from typing import List
+from typing import Iterable, List, Union
 
+import _batch_concave_enclosed_csf_list
 import _concave_enclosed_csf_list
+import _curve_array
 import _csf_list
-import _image_curve
+import _multi_resolution_concave_enclosed_csf_list
+import _step_controller_classes
 
 
-def enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_size: float = 1):
+# Iterations between checkpoints of a rewinding retry.
+REWIND_CHECKPOINT_INTERVAL = 100
+
+
+def enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_size: float = 1, compact: bool = False,
+                      bounded_memory: bool = False, area_targeted: bool = False, max_seconds: float = 100,
+                      cancel_event=None, intersection_check_interval: int = None, adaptive_step: bool = False,
+                      coarsening: float = None):
     """
     Runs the enclosed curve shortening flow algorithm on a curve and returns n_subsets curves that are have an enclosed
     area linearly-spaced between the initial curves enclosed area and zero.
@@ -19,9 +33,30 @@ def enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_size: float = 1):
     :param n_subsets: Number of subsets to return. Subsets are linearly proportional of the area of the initial outline.
     :param step_size: Step size for each iteration of the concave ECSF algorithm.
     If the algorithm fails, try a smaller step size.
+    :param compact: Return a CurveArray, holding every curve in one contiguous block, instead of a list.
+    :param bounded_memory: During the concave flow, store only one curve per 1/n_subsets of the initial area.
+    :param area_targeted: During the concave flow, save curves only as the enclosed area reaches each multiple of
+    1/n_subsets of the initial area, rather than every few iterations and selecting from them afterwards.
+    :param max_seconds: Time limit of the concave flow, after which the last curve is taken as its result.
+    :param cancel_event: Event that stops the concave flow when set, as max_seconds does.
+    :param intersection_check_interval: Check the curve for new loops every intersection_check_interval iterations
+    and fail as soon as one forms, rather than when the length next grows.
+    :param adaptive_step: Choose the step size of each iteration from the displacement of the curve, growing it where
+    the curve is smooth and shrinking it near tight concavities.  step_size then scales the permitted displacement.
+    :param coarsening: If given, run the concave flow on the curve decimated to 1/coarsening of its vertices, and
+    refine the saved curves to full resolution.  The flow is faster, but the curves differ from those of the full flow.
     :return:  n_subsets long list of 2D numpy arrays.
     """
-    ecsf_obj = _concave_enclosed_csf_list.ConcaveEnclosedCSFList(curve, step_size=step_size)
+    save_area_fractions = 1 - np.arange(n_subsets) / n_subsets if area_targeted else None
+    ecsf_kwargs = dict(step_size=step_size, max_stored_curves=n_subsets if bounded_memory else None,
+                       save_area_fractions=save_area_fractions, max_seconds=max_seconds, cancel_event=cancel_event,
+                       intersection_check_interval=intersection_check_interval,
+                       step_controller=_step_controller(step_size, adaptive_step))
+    if coarsening is None:
+        ecsf_obj = _concave_enclosed_csf_list.ConcaveEnclosedCSFList(curve, **ecsf_kwargs)
+    else:
+        ecsf_obj = _multi_resolution_concave_enclosed_csf_list.MultiResolutionConcaveEnclosedCSFList(
+            curve, coarsening=coarsening, **ecsf_kwargs)
 
     try:
         ecsf_obj.run()
@@ -29,18 +64,53 @@ def enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_size: float = 1):
         logging.exception('loop in curve detected')
         raise curve_loop_detected
 
+    return _append_convex_curves(_concave_curves(ecsf_obj, n_subsets, area_targeted), n_subsets, compact)
+
+
+def _step_controller(step_size: float, adaptive_step: bool):
+    # Adaptive steps keep the bounds of the default controller at step_size 1, so that retries shrink them as they
+    # would a fixed step size.
+
+    if not adaptive_step:
+        return None
+
+    return _step_controller_classes.DisplacementECSFStepController(
+        max_edge_fraction=_step_controller_classes.MAX_EDGE_FRACTION * step_size,
+        max_curvature_fraction=_step_controller_classes.MAX_CURVATURE_FRACTION * step_size,
+        min_step_size=_step_controller_classes.MIN_STEP_SIZE * step_size,
+        max_step_size=_step_controller_classes.MAX_STEP_SIZE * step_size)
+
+
+def _concave_curves(ecsf_obj: _concave_enclosed_csf_list.ConcaveEnclosedCSFList, n_subsets: int,
+                    area_targeted: bool = False):
+    # Curves of a finished concave flow to include in the n_subsets results, in proportion to the area they cover.
+
+    if area_targeted:
+        return list(ecsf_obj.curves)
+
     num_concave_curves = max(1, int((1 - ecsf_obj.last_to_first_curve_area_ratio()) * n_subsets))
 
-    concave_curves = ecsf_obj.get_n_curves(num_concave_curves)
+    return ecsf_obj.get_n_curves(num_concave_curves)
+
+
+def _append_convex_curves(concave_curves: List, n_subsets: int, compact: bool):
+    # Complete the concave curves with curve shortening flow of the last one, up to n_subsets curves.
+
+    num_concave_curves = len(concave_curves)
 
     csf_obj = _csf_list.CSFList(concave_curves[-1])
 
     convex_curves = csf_obj.mm_subset(n_subsets - num_concave_curves + 1)
 
-    return concave_curves + convex_curves[1:]
+    ecsf_list = concave_curves + convex_curves[1:]
+
+    return _curve_array.from_curves(ecsf_list) if compact else ecsf_list
 
 
-def enclosed_csf_list_retry_on_fail(curve: np.ndarray, n_subsets: int, step_size: float = 1):
+def enclosed_csf_list_retry_on_fail(curve: np.ndarray, n_subsets: int, step_size: float = 1, compact: bool = False,
+                                    max_seconds: float = None, speculative: str = None,
+                                    intersection_check_interval: int = None, rewind: bool = False,
+                                    adaptive_step: bool = False):
     """
     Runs enclosed_csf_list(). If algorithm fails, step_size is reduced by a factor of 5 and the algorithm is run again.
     Fails if algorithm fails 4 times.
@@ -49,12 +119,75 @@ def enclosed_csf_list_retry_on_fail(curve: np.ndarray, n_subsets: int, step_size
     :param n_subsets: Number of subsets to return. Subsets are linearly proportional of the area of the initial outline.
     :param step_size: Step size for each iteration of the concave ECSF algorithm.
     If the algorithm fails, try a smaller step size.
+    :param compact: Return a CurveArray, holding every curve in one contiguous block, instead of a list.
+    :param max_seconds: Time limit shared by every attempt.  Each attempt's concave flow is limited to the time left.
+    :param speculative: 'thread' or 'process' to run all four step sizes at once, in threads or processes, instead of
+    one after another.  The result of the largest step size that succeeds is returned, and runs with smaller step
+    sizes are cancelled as soon as a larger one succeeds.
+    :param intersection_check_interval: Check for new loops every intersection_check_interval iterations, so that a
+    failing step size is abandoned as soon as a loop forms.
+    :param rewind: Instead of restarting from the initial curve, continue each attempt from the last good checkpoint
+    of the failed attempt, so the part of the flow before the loop formed is not recomputed.
+    :param adaptive_step: Adapt the step size of each iteration, as enclosed_csf_list().
     :return:  n_subsets long list of 2D numpy arrays.
     """
+    if speculative is not None and rewind:
+        raise ValueError("Speculative and rewinding retries cannot be combined.")
+
+    if rewind:
+        return _rewinding_enclosed_csf_list(curve, n_subsets, step_size, compact, max_seconds,
+                                            intersection_check_interval, adaptive_step)
+
+    if speculative is not None:
+        return _speculative_enclosed_csf_list(curve, n_subsets, [step_size / 5**i for i in range(4)], compact,
+                                              100 if max_seconds is None else max_seconds, speculative,
+                                              intersection_check_interval, adaptive_step)
+
+    deadline = None if max_seconds is None else time.time() + max_seconds
+
     for _ in range(4):
+        kwargs = {'intersection_check_interval': intersection_check_interval, 'adaptive_step': adaptive_step}
+        if deadline is not None:
+            kwargs['max_seconds'] = max(0., deadline - time.time())
         try:
-            ecsf_list = enclosed_csf_list(curve, n_subsets, step_size)
-        except Exception:
+            ecsf_list = enclosed_csf_list(curve, n_subsets, step_size, compact, **kwargs)
+        except Exception as error:
+            _check_deadline(deadline, max_seconds, error)
+            step_size /= 5
+        else:
+            break
+    else:
+        raise Exception(f"Loop detected with step size {step_size}. Curve cannot be shortened.")
+
+    return ecsf_list
+
+
+def _rewinding_enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_size: float, compact: bool,
+                                 max_seconds: float, intersection_check_interval: int, adaptive_step: bool = False):
+    # Retry from the last good checkpoint of each failed attempt with a smaller step size.
+    # A failed attempt that confirmed no new checkpoint keeps the checkpoint it resumed from.
+
+    deadline = None if max_seconds is None else time.time() + max_seconds
+    checkpoint = None
+
+    for _ in range(4):
+        kwargs = {'intersection_check_interval': intersection_check_interval}
+        if deadline is not None:
+            # The time spent reaching the checkpoint counts against the flow's limit when it resumes.
+            elapsed_seconds = 0 if checkpoint is None else checkpoint.elapsed_seconds
+            kwargs['max_seconds'] = max(0., deadline - time.time()) + elapsed_seconds
+
+        ecsf_obj = _concave_enclosed_csf_list.ConcaveEnclosedCSFList(
+            curve, step_size=step_size, checkpoint_interval=REWIND_CHECKPOINT_INTERVAL,
+            step_controller=_step_controller(step_size, adaptive_step), **kwargs)
+        try:
+            ecsf_obj.run(checkpoint)
+            ecsf_list = _append_convex_curves(_concave_curves(ecsf_obj, n_subsets), n_subsets, compact)
+        except Exception as error:
+            _check_deadline(deadline, max_seconds, error)
+            logging.info(f'loop in curve detected, rewinding to iteration '
+                         f'{0 if ecsf_obj.checkpoint is None else ecsf_obj.checkpoint.iteration}')
+            checkpoint = ecsf_obj.checkpoint
             step_size /= 5
         else:
             break
@@ -64,7 +197,243 @@ def enclosed_csf_list_retry_on_fail(curve: np.ndarray, n_subsets: int, step_size
     return ecsf_list
 
 
+def _check_deadline(deadline: float, max_seconds: float, error: Exception):
+    # An attempt that fails once the time limit has passed may have run out of time rather than formed a loop, so
+    # retrying would fail the same way.
+
+    if deadline is not None and time.time() >= deadline:
+        raise TimeoutError(f"Time limit of {max_seconds} seconds reached before the curve was shortened.") from error
+
+
+def _speculative_enclosed_csf_list(curve: np.ndarray, n_subsets: int, step_sizes: List[float], compact: bool,
+                                   max_seconds: float, speculative: str, intersection_check_interval: int = None,
+                                   adaptive_step: bool = False):
+    # Run enclosed_csf_list with every step size at once, largest first.  When a run succeeds, the runs with smaller
+    # step sizes can no longer be chosen and are cancelled through their events.
+
+    if speculative not in ('thread', 'process'):
+        raise ValueError(f"Unknown speculative mode '{speculative}'. Use 'thread' or 'process'.")
+
+    with contextlib.ExitStack() as stack:
+        if speculative == 'thread':
+            cancel_events = [threading.Event() for _ in step_sizes]
+            executor = stack.enter_context(concurrent.futures.ThreadPoolExecutor(len(step_sizes)))
+        else:
+            manager = stack.enter_context(multiprocessing.Manager())
+            cancel_events = [manager.Event() for _ in step_sizes]
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(len(step_sizes)))
+
+        futures = [executor.submit(enclosed_csf_list, curve, n_subsets, step_size, compact, max_seconds=max_seconds,
+                                   cancel_event=cancel_event, intersection_check_interval=intersection_check_interval,
+                                   adaptive_step=adaptive_step)
+                   for step_size, cancel_event in zip(step_sizes, cancel_events)]
+
+        def cancel_smaller_step_sizes(i):
+            def callback(future):
+                if not future.cancelled() and future.exception() is None:
+                    for cancel_event in cancel_events[i + 1:]:
+                        cancel_event.set()
+            return callback
+
+        for i, future in enumerate(futures):
+            future.add_done_callback(cancel_smaller_step_sizes(i))
+
+        # Every larger step size has failed by the time a run's result is taken.
+        for future in futures:
+            try:
+                return future.result()
+            except Exception:
+                continue
+
+    raise Exception(f"Loop detected with step size {step_sizes[-1] / 5}. Curve cannot be shortened.")
+
+
+def enclosed_csf_list_batch(curves: List[np.ndarray], n_subsets: int, step_size: float = 1, batch_size: int = 32,
+                            retry_on_fail: bool = True, compact: bool = False):
+    """
+    Runs enclosed_csf_list() on many curves, flowing up to batch_size curves of similar vertex count at once.
+
+    If the algorithm fails on a curve and retry_on_fail is set, the failed curves are run again together with the
+    step size reduced by a factor of 5, up to 4 attempts as enclosed_csf_list_retry_on_fail().  Curves that still
+    fail have an Exception in place of their list.
+
+    :param curves: List of Nx2 Numpy arrays of the outlines of images.  Curves must run clockwise.
+    :param n_subsets: Number of subsets to return for each curve.
+    :param step_size: Step size for each iteration of the concave ECSF algorithm.
+    :param batch_size: Maximum number of curves flowed at once.
+    :param retry_on_fail: Retry failed curves with smaller step sizes.
+    :param compact: Return a CurveArray for each curve instead of a list.
+    :return: List, in the order of curves, of n_subsets long lists of 2D numpy arrays.
+    """
+    results = [Exception("Intersection in subset curve, try a smaller step size.") for _ in curves]
+
+    # Grouping curves of similar length keeps the batches evenly loaded as curves finish.
+    remaining = sorted(range(len(curves)), key=lambda i: curves[i].shape[0])
+
+    for _ in range(4 if retry_on_fail else 1):
+        failed = []
+
+        for start in range(0, len(remaining), batch_size):
+            group = remaining[start:start + batch_size]
+            batch_obj = _batch_concave_enclosed_csf_list.BatchConcaveEnclosedCSFList([curves[i] for i in group],
+                                                                                     step_size=step_size)
+            batch_obj.run()
+
+            for member, i in enumerate(group):
+                if batch_obj.failed[member]:
+                    failed.append(i)
+                    continue
+
+                # A curve that starts convex finishes before its first save.
+                if batch_obj.curves[member]:
+                    num_concave_curves = max(1, int((1 - batch_obj.last_to_first_curve_area_ratio(member))
+                                                    * n_subsets))
+                    concave_curves = batch_obj.get_n_curves(member, num_concave_curves)
+                else:
+                    concave_curves = [batch_obj.final_curves[member]]
+
+                results[i] = _append_convex_curves(concave_curves, n_subsets, compact)
+
+        if not failed:
+            break
+
+        logging.warning(f'loop in {len(failed)} curves detected with step size {step_size}')
+        remaining = failed
+        step_size /= 5
+
+    return results
+
+
+def enclosed_csf_list_parallel(curves: Iterable[Union[np.ndarray, str]], n_subsets: int, step_size: float = 1,
+                               max_workers: int = None, chunksize: int = 1, ordered: bool = True,
+                               max_seconds: float = 100, shared_memory: bool = True, compact: bool = False):
+    """
+    Runs enclosed_csf_list_retry_on_fail() on many curves across a pool of processes.
+
+    Yields (index, ecsf_list) pairs, where index is the position of the curve in curves, either in the order of
+    curves or as each result completes.  Curves that cannot be shortened have an Exception in place of their list.
+
+    :param curves: Nx2 Numpy arrays of the outlines of images, or paths of images whose outlines are used.
+    :param n_subsets: Number of subsets to return for each curve.
+    :param step_size: Step size for each iteration of the concave ECSF algorithm.
+    :param max_workers: Number of processes.  Defaults to the number of processors.
+    :param chunksize: Number of curves sent to a process at a time.
+    :param ordered: Yield results in the order of curves, instead of as they complete.
+    :param max_seconds: Time limit of each curve, after which its concave flow stops with the last curve.
+    :param shared_memory: Return the curves of each result through shared memory instead of pickling them.
+    :param compact: Yield a CurveArray for each curve instead of a list.
+
+    Closing the generator early cancels the chunks not yet started, and returns without waiting for those running.
+    Their processes exit, and release the shared memory of their results, as they finish.
+    """
+    tasks = list(enumerate(curves))
+    received = {}
+    next_index = 0
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+    futures = [executor.submit(_enclosed_csf_list_chunk, tasks[start:start + chunksize], n_subsets, step_size,
+                               max_seconds, shared_memory)
+               for start in range(0, len(tasks), chunksize)]
+
+    collected = set()
+    try:
+        for future in concurrent.futures.as_completed(futures):
+            collected.add(future)
+            for index, result in future.result():
+                received[index] = _unpack_parallel_result(result, shared_memory, compact)
+
+            if not ordered:
+                yield from received.items()
+                received.clear()
+
+            while next_index in received:
+                yield next_index, received.pop(next_index)
+                next_index += 1
+    finally:
+        # When iteration stops early, the shared memory of the results of running chunks is released as each
+        # completes.  Shutting down with the executor as a context manager would wait for them.
+        for future in futures:
+            if future not in collected and not future.cancel() and shared_memory:
+                future.add_done_callback(_release_parallel_results)
+        executor.shutdown(wait=len(collected) == len(futures), cancel_futures=True)
+
+
+def _enclosed_csf_list_chunk(tasks: List, n_subsets: int, step_size: float, max_seconds: float,
+                             use_shared_memory: bool):
+    # Worker of enclosed_csf_list_parallel.  Errors are returned in place of results, so that one curve does not
+    # fail the rest of its chunk.
+
+    results = []
+    for index, curve in tasks:
+        try:
+            if isinstance(curve, str):
+                curve = _load_curve(curve)
+            ecsf_list = enclosed_csf_list_retry_on_fail(curve, n_subsets, step_size, compact=True,
+                                                        max_seconds=max_seconds)
+        except Exception as error:
+            results.append((index, error))
+        else:
+            results.append((index, _curve_array.to_shared_memory(ecsf_list) if use_shared_memory else ecsf_list))
+
+    return results
+
+
+def _release_parallel_results(future: concurrent.futures.Future):
+    if future.exception() is None:
+        for _, result in future.result():
+            _unpack_parallel_result(result, shared_memory=True, compact=True)
+
+
+def _unpack_parallel_result(result, shared_memory: bool, compact: bool):
+    if isinstance(result, Exception):
+        return result
+
+    ecsf_list = _curve_array.from_shared_memory(*result) if shared_memory else result
+
+    return ecsf_list if compact else ecsf_list.to_list()
+
+
+def _load_curve(path: str):
+    # Outline of an image file, padded as in the silhouette functions.
+    # The image modules import scikit-image, OpenCV and PIL, so they are only imported once an image is needed.
+
+    import _image_curve
+    import _image_processing
+
+    image = _image_processing.load_image(path)
+    if image is None:
+        raise Exception(f"Image {path} could not be loaded.")
+
+    return _image_curve.ImageCurve(np.pad(image, 10)).curve()
+
+
+def image_curves(path: str, holes: bool = True, min_pixels: int = 1) -> List[np.ndarray]:
+    """
+    Outlines of every silhouette in an image file, and of the holes in them, for enclosed_csf_list_batch().
+
+    All outlines are found from one labelling of the image.  Outlines run clockwise around their own regions, so a
+    hole flows as a silhouette of the background.  Use _image_curve.image_contours() for the enclosing outline of each.
+
+    :param path: Path of the image file.
+    :param holes: Include the outlines of holes.
+    :param min_pixels: Leave out silhouettes and holes of fewer pixels.
+    :return: List of Nx2 numpy arrays, in raster order of their top-left-most pixels.
+    """
+    import _image_curve
+    import _image_processing
+
+    image = _image_processing.load_image(path)
+    if image is None:
+        raise Exception(f"Image {path} could not be loaded.")
+
+    return [contour.curve for contour in _image_curve.image_contours(np.pad(image, 10), min_pixels)
+            if holes or not contour.is_hole]
+
+
 def to_image_matrix(ecsf_list: List):
+    import skgeom
+    import _image_curve
+
     polygon = skgeom.Polygon(ecsf_list[0])
     bbox = polygon.bbox()
     xmin, xmax = bbox.xmin(), bbox.xmax()
@@ -1,7 +1,13 @@
+import os
+import tempfile
+
 import numpy as np
 
 from unittest import TestCase
-from _image_curve import _edge_detect, ImageCurve, curve_to_image_matrix, curve_to_image_matrix_filled
+
+import _metrics
+from _image_curve import _edge_detect, ImageCurve, TiledImageCurve, curve_to_image_matrix, \
+    curve_to_image_matrix_filled, image_contours
 
 
 class Test(TestCase):
@@ -90,6 +96,124 @@ class Test(TestCase):
 
         self.assertTrue(np.allclose(ImageCurve(test_input).curve(), output))
 
+    def test_imagecurve_curve_concave_visits_in_dfs_order(self):
+        test_input = np.zeros((8, 9))
+        test_input[1:7, 1:8] = 1
+        test_input[3:5, 3:8] = 0
+        test_input[6, 4] = 0
+
+        output = np.array([[1, 1], [1, 2], [1, 3], [1, 4], [1, 5], [1, 6], [1, 7], [2, 7], [2, 6], [2, 5], [2, 4],
+                           [2, 3], [3, 2], [4, 2], [3, 1], [4, 1], [5, 1], [6, 1], [6, 2], [6, 3], [5, 3], [5, 4],
+                           [5, 5], [5, 6], [5, 7], [6, 7], [6, 6], [6, 5], [2, 1]])
+
+        self.assertTrue(np.array_equal(ImageCurve(test_input).curve(), output))
+
+    def test_imagecurve_subpixel_curve_square(self):
+        test_input = np.zeros((8, 8))
+        test_input[2:6, 2:6] = 1
+
+        output = ImageCurve(test_input).subpixel_curve(spacing=0.5)
+        edge_lengths = np.linalg.norm(output - np.roll(output, 1, axis=0), axis=1)
+
+        self.assertTrue(np.allclose(output[0], [1.5, 2]))
+        self.assertTrue(_metrics.is_clockwise(output))
+        self.assertAlmostEqual(np.mean(edge_lengths), 0.5, delta=0.05)
+        self.assertAlmostEqual(_metrics.enclosed_area(output), 15.5, delta=0.5)
+        self.assertTrue(np.all((output >= 1.5) & (output <= 5.5)))
+
+    def test_imagecurve_subpixel_curve_smoothed_is_outline_of_starting_silhouette(self):
+        test_input = np.zeros((10, 14))
+        test_input[2:8, 2:8] = 1
+        test_input[2:8, 10:12] = 1
+
+        output = ImageCurve(test_input).subpixel_curve(sigma=1)
+
+        self.assertTrue(_metrics.is_clockwise(output))
+        self.assertTrue(np.all(output[:, 1] < 9))
+        self.assertAlmostEqual(_metrics.enclosed_area(output), 36, delta=6)
+
+    def test_imagecurve_subpixel_curve_empty(self):
+        self.assertEqual(ImageCurve(np.zeros((3, 3))).subpixel_curve().size, 0)
+
+    def test_tiledimagecurve_matches_imagecurve(self):
+        test_input = np.zeros((12, 11))
+        test_input[1:10, 1:9] = 1
+        test_input[3:5, 3:9] = 0
+        test_input[7, 4] = 0
+        test_input[6:8, 6:8] = 0
+
+        for tile_rows in [1, 2, 5, 100]:
+            self.assertTrue(np.array_equal(TiledImageCurve(test_input, tile_rows).curve(),
+                                           ImageCurve(test_input).curve()))
+            self.assertTrue(np.array_equal(TiledImageCurve(1 - test_input, tile_rows).curve(),
+                                           ImageCurve(1 - test_input).curve()))
+
+    def test_tiledimagecurve_memmap(self):
+        test_input = np.zeros((9, 8), dtype=bool)
+        test_input[2:7, 1:6] = True
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'im.npy')
+            np.save(path, test_input)
+            image_curve = TiledImageCurve(np.load(path, mmap_mode='r'), tile_rows=3)
+
+            self.assertTrue(np.array_equal(image_curve.start(), [2, 1]))
+            self.assertTrue(np.array_equal(image_curve.curve(), ImageCurve(test_input).curve()))
+
+    def test_tiledimagecurve_empty(self):
+        self.assertEqual(TiledImageCurve(np.zeros((3, 3)), 2).curve().size, 0)
+
+    def test_image_contours_single_silhouette_matches_imagecurve(self):
+        test_input = np.zeros((8, 9))
+        test_input[1:7, 1:8] = 1
+        test_input[3:5, 3:8] = 0
+
+        contours = image_contours(test_input)
+
+        self.assertEqual(len(contours), 1)
+        self.assertTrue(np.array_equal(contours[0].curve, ImageCurve(test_input).curve()))
+        self.assertEqual((contours[0].parent, contours[0].is_hole, contours[0].pixels), (None, False, 32))
+
+    def test_image_contours_hierarchy(self):
+        test_input = np.zeros((12, 14), dtype=int)
+        test_input[1:10, 1:10] = 1
+        test_input[3:8, 3:8] = 0
+        test_input[4:7, 4:7] = 1
+        test_input[2:4, 11:13] = 1
+
+        contours = image_contours(test_input)
+
+        self.assertEqual([(contour.parent, contour.is_hole) for contour in contours],
+                         [(None, False), (None, False), (0, True), (2, False)])
+        self.assertTrue(np.array_equal(contours[1].curve, ImageCurve(test_input[:6, 10:]).curve() + (0, 10)))
+        self.assertTrue(np.array_equal(contours[2].curve[0], [3, 3]))
+        self.assertTrue(np.array_equal(contours[3].curve, ImageCurve(test_input[3:8, 3:8]).curve() + (3, 3)))
+
+    def test_image_contours_small_regions_are_left_out_and_their_children_kept(self):
+        test_input = np.zeros((13, 13), dtype=int)
+        test_input[1:12, 1:12] = 1
+        test_input[3:10, 3:10] = 0
+        test_input[4:9, 4:9] = 1
+
+        contours = image_contours(test_input)
+
+        self.assertEqual([(contour.parent, contour.is_hole, contour.pixels) for contour in contours],
+                         [(None, False, 72), (0, True, 24), (1, False, 25)])
+
+        contours = image_contours(test_input, min_pixels=25)
+
+        self.assertEqual([(contour.parent, contour.is_hole, contour.pixels) for contour in contours],
+                         [(None, False, 72), (0, False, 25)])
+
+    def test_image_contours_inverted_background(self):
+        test_input = np.ones((6, 6), dtype=int)
+        test_input[2:4, 2:4] = 0
+
+        contours = image_contours(test_input)
+
+        self.assertEqual(len(contours), 1)
+        self.assertTrue(np.array_equal(contours[0].curve, ImageCurve(1 - test_input).curve()))
+
     def test_curve_to_image_matrix_length10_square(self):
         sidelen = 10
         test_inputx = np.hstack((np.arange(sidelen-1), (sidelen-1) * np.ones(sidelen-1),
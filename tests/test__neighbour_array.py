@@ -0,0 +1,67 @@
+import numpy as np
+
+from unittest import TestCase
+
+import _neighbour_array
+
+
+class Test(TestCase):
+    def test_neighbour_codes_match_neighbour_array(self):
+        test_input = np.zeros((6, 7), dtype=int)
+        test_input[1:5, 1:6] = np.random.default_rng(0).integers(0, 2, (4, 5))
+        flat_indices = np.flatnonzero(np.pad(np.ones((4, 5)), 1))
+
+        codes = _neighbour_array.neighbour_codes(test_input, flat_indices)
+
+        self.assertTrue(np.array_equal(codes, _neighbour_array.get_neighbour_array(test_input).ravel()[flat_indices]))
+
+    def test_neighbour_coordinates_table_matches_coordinates_of_each_code(self):
+        table = _neighbour_array.neighbour_coordinates_table()
+
+        self.assertEqual(len(table), 256)
+        for b in [0, 0b00000101, 0b10101010, 0b11111111]:
+            self.assertEqual(set(table[b]), _neighbour_array.side_neighbour_coordinates(b) |
+                             _neighbour_array.diagonal_neighbour_coordinates(b))
+            self.assertEqual(len(table[b]), bin(b).count('1'))
+
+    def test_tables_match_bit_loops(self):
+        for b in range(256):
+            self.assertEqual(_neighbour_array.number_of_neighbours(b), bin(b).count('1'))
+            self.assertEqual(_neighbour_array.number_of_connected_neighbours(b),
+                             _neighbour_array._number_of_01_patterns_in_ordered_neighbours_set(b))
+            self.assertEqual(_neighbour_array.number_of_side_neighbours(b),
+                             len(_neighbour_array.side_neighbour_coordinates(b)))
+            self.assertEqual(_neighbour_array.number_of_diagonal_neighbours(b),
+                             len(_neighbour_array.diagonal_neighbour_coordinates(b)))
+            self.assertEqual(_neighbour_array.is_top_left_corner_of_square(b), b & 0b00011100 == 0b00011100)
+
+        for b in range(0, 2 ** 16, 97):
+            self.assertEqual(_neighbour_array.number_of_connected_second_neighbours(b),
+                             _neighbour_array._number_of_01_patterns_in_ordered_second_neighbours_set(b))
+
+    def test_predicates_of_arrays_are_those_of_their_codes(self):
+        test_input = np.array([[0, 1, 1],
+                               [1, 1, 0],
+                               [0, 0, 1]])
+
+        self.assertEqual(_neighbour_array.number_of_connected_neighbours(test_input), 3)
+        self.assertEqual(_neighbour_array.side_neighbour_coordinates(test_input), {(-1, 0), (0, -1)})
+        self.assertEqual(_neighbour_array.diagonal_neighbour_coordinates(test_input), {(-1, 1), (1, 1)})
+
+    def test_array_predicates_match_predicates_of_each_pixel(self):
+        test_input = np.zeros((8, 9), dtype=int)
+        test_input[2:6, 2:7] = np.random.default_rng(1).integers(0, 2, (4, 5))
+        padded_input = np.pad(test_input, 2)
+
+        neighbour_array = _neighbour_array.get_neighbour_array(test_input)
+        connected = _neighbour_array.number_of_connected_neighbours_array(neighbour_array)
+        second_neighbour_array = _neighbour_array.get_second_neighbour_array(test_input)
+        second_neighbours = _neighbour_array.number_of_second_neighbours_array(second_neighbour_array)
+
+        for x, y in np.ndindex(test_input.shape):
+            self.assertEqual(connected[x, y],
+                             _neighbour_array.number_of_connected_neighbours(padded_input[x + 1:x + 4, y + 1:y + 4]))
+            neighbourhood = padded_input[x:x + 5, y:y + 5]
+            self.assertEqual(second_neighbour_array[x, y],
+                             _neighbour_array.second_neighbours_array_to_binary(neighbourhood))
+            self.assertEqual(second_neighbours[x, y], _neighbour_array.number_of_second_neighbours(neighbourhood))
@@ -0,0 +1,66 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+from scipy import ndimage
+
+import _utils
+from _batch_concave_enclosed_csf_list import BatchConcaveEnclosedCSFList, _RaggedLayout, _ragged_gaussian_filter, \
+    _ragged_resample
+from _concave_enclosed_csf_list import ConcaveEnclosedCSFList
+
+test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
+
+
+def _test_curves():
+    heart = np.load(os.path.join(test_dir, "heart_curve.npy")).astype(float)
+    t = np.linspace(0, 2*np.pi, 80, endpoint=False)
+    circle = np.column_stack((50 * np.cos(t) + 60, -50 * np.sin(t) + 60))
+
+    return [heart, circle, heart[::3] / 3 + 7]
+
+
+class TestBatchConcaveEnclosedCSFList(TestCase):
+    def test_run_matches_concave_enclosed_csf_list(self):
+        curves = _test_curves()
+
+        batch_obj = BatchConcaveEnclosedCSFList(curves, max_iterations=300)
+        batch_obj.run()
+
+        for member, curve in enumerate(curves):
+            ecsf_obj = ConcaveEnclosedCSFList(curve, max_iterations=300, refresh_interval=1000)
+            ecsf_obj.run()
+
+            self.assertFalse(batch_obj.failed[member])
+            self.assertEqual(batch_obj.iterations[member], ecsf_obj.iterative_terminator.curr_iterations)
+            self.assertEqual(len(batch_obj.curves[member]), len(ecsf_obj.curves))
+            for curve_batch, curve_serial in zip(batch_obj.curves[member], ecsf_obj.curves):
+                self.assertTrue(np.allclose(curve_batch, curve_serial))
+            self.assertTrue(np.allclose(batch_obj.final_curves[member], ecsf_obj.curr_curve))
+
+    def test_run_empty_batch(self):
+        batch_obj = BatchConcaveEnclosedCSFList([])
+        batch_obj.run()
+
+        self.assertEqual(batch_obj.curves, [])
+
+    def test_ragged_gaussian_filter_matches_wrap_filter_of_each_curve(self):
+        curves = _test_curves() + [np.arange(10, dtype=float).reshape(5, 2)]
+        layout = _RaggedLayout(np.array([curve.shape[0] for curve in curves]))
+
+        filtered = _ragged_gaussian_filter(np.concatenate(curves), layout, 10)
+
+        for i, curve in enumerate(curves):
+            self.assertTrue(np.array_equal(layout.curve(filtered, i),
+                                           ndimage.gaussian_filter1d(curve, 10, axis=0, mode='wrap')))
+
+    def test_ragged_resample_matches_resample_of_each_curve(self):
+        curves = _test_curves()
+        factors = np.array([0.5, 1.3, 2.0])
+        layout = _RaggedLayout(np.array([curve.shape[0] for curve in curves]))
+
+        resampled, counts = _ragged_resample(np.concatenate(curves), layout, factors)
+        resampled_layout = _RaggedLayout(counts)
+
+        for i, curve in enumerate(curves):
+            self.assertTrue(np.allclose(resampled_layout.curve(resampled, i), _utils.resample(curve, factors[i])))
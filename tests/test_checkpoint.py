@@ -0,0 +1,33 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import _checkpoint
+
+
+class TestCheckpoint(TestCase):
+    def test_save_load_round_trip(self):
+        curves = [np.random.random((5, 2)), np.random.random((3, 2))]
+        checkpoint = _checkpoint.ECSFCheckpoint(200, 0.2, 0.5, np.random.random((4, 2)), curves, [10., 9.5], [0, 1],
+                                                np.array([[1., 2.]]), 3.5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'checkpoint.npz')
+            checkpoint.save(filename)
+            loaded = _checkpoint.load(filename)
+
+            self.assertEqual(os.listdir(directory), ['checkpoint.npz'])
+
+        self.assertEqual(loaded.iteration, 200)
+        self.assertEqual(loaded.step_size, 0.2)
+        self.assertEqual(loaded.resampling_factor, 0.5)
+        self.assertTrue(np.array_equal(loaded.curve, checkpoint.curve))
+        self.assertEqual(len(loaded.curves), 2)
+        for curve, output in zip(loaded.curves, curves):
+            self.assertTrue(np.array_equal(curve, output))
+        self.assertEqual(loaded.lengths, [10., 9.5])
+        self.assertEqual(loaded.stored_area_bins, [0, 1])
+        self.assertTrue(np.array_equal(loaded.crossing_points, [[1., 2.]]))
+        self.assertEqual(loaded.elapsed_seconds, 3.5)
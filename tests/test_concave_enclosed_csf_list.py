@@ -1,9 +1,16 @@
+import os
+import threading
 from unittest import TestCase
 
 import numpy as np
 
+import _metrics
+import _utils
 from _concave_enclosed_csf_list import ConcaveEnclosedCSFList
+from _resampler_classes import UniformityECSFResampler
+from _step_controller_classes import DisplacementECSFStepController
 
+test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
 
 class TestConcaveEnclosedCSFList(TestCase):
     def test_filtered_step_vector_circular_curve_result_points_inward(self):
@@ -11,4 +18,139 @@ class TestConcaveEnclosedCSFList(TestCase):
                                 (500 * (np.sin(np.linspace(0, 2*np.pi)) + 1.2)))
         ConcaveEnclosedCSFList(test_input_curve)
 
+    def test_saved_curves_are_copied_out_of_the_workspace(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
 
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, max_iterations=250, save_interval=25, refresh_interval=1000)
+        stepped_curve = ecsf.workspace.array('stepped_curve', test_input_curve.shape[0], 2)
+        ecsf.run()
+
+        areas = [_metrics.enclosed_area(curve) for curve in ecsf.curves]
+        self.assertGreater(len(ecsf.curves), 3)
+        self.assertTrue(np.all(np.diff(areas) < 0))
+        self.assertTrue(np.shares_memory(ecsf.workspace.array('stepped_curve', 1, 2), stepped_curve))
+        for curve in ecsf.curves[1:]:
+            self.assertFalse(np.shares_memory(curve, ecsf.curr_curve))
+            self.assertFalse(np.shares_memory(curve, stepped_curve))
+
+    def test_iter_run_yields_saved_curves(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, max_iterations=100, save_interval=25, refresh_interval=1000)
+
+        saved_curves = list(ecsf.iter_run())
+
+        self.assertEqual([saved.iteration for saved in saved_curves], [0, 25, 50, 75])
+        self.assertEqual(len(ecsf.curves), 4)
+        for saved, curve in zip(saved_curves, ecsf.curves):
+            self.assertIs(saved.curve, curve)
+        self.assertTrue(all(a > b for a, b in zip([s.area for s in saved_curves], [s.area for s in saved_curves][1:])))
+
+    def test_max_stored_curves_bounds_memory(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, max_iterations=120, save_interval=1, refresh_interval=1000,
+                                      max_stored_curves=3)
+
+        saved_curves = list(ecsf.iter_run())
+
+        self.assertEqual(len(saved_curves), 120)
+        self.assertLessEqual(len(ecsf.curves), 3 + 2)
+        self.assertIs(ecsf.curves[0], saved_curves[0].curve)
+        self.assertIs(ecsf.curves[-1], saved_curves[-1].curve)
+
+    def test_save_area_fractions(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_area_fractions=[1, 0.98, 0.96])
+
+        ecsf.run()
+
+        self.assertEqual(len(ecsf.curves), 3)
+        self.assertTrue(np.allclose([_metrics.enclosed_area(curve) / ecsf.initial_area for curve in ecsf.curves],
+                                    [1, 0.98, 0.96], atol=5e-3))
+
+    def test_cancel_event_stops_run(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        cancel_event = threading.Event()
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=1,
+                                      cancel_event=cancel_event)
+
+        for saved in ecsf.iter_run():
+            if saved.iteration == 5:
+                cancel_event.set()
+
+        self.assertEqual(ecsf.iterative_terminator.curr_iterations, 6)
+
+    def test_intersection_check_does_not_change_clean_run(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000)
+        ecsf_checked = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, intersection_check_interval=1)
+
+        ecsf.run()
+        ecsf_checked.run()
+
+        self.assertEqual(len(ecsf.curves), len(ecsf_checked.curves))
+        self.assertTrue(np.array_equal(ecsf.curr_curve, ecsf_checked.curr_curve))
+
+    def test_resume_from_checkpoint_matches_uninterrupted_run(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=10)
+        ecsf.run()
+
+        interrupted = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=10,
+                                             checkpoint_interval=30)
+        for saved in interrupted.iter_run():
+            if saved.iteration == 70:
+                break
+        self.assertEqual(interrupted.checkpoint.iteration, 30)
+
+        resumed = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=10)
+        resumed.run(interrupted.checkpoint)
+
+        self.assertEqual(resumed.iterative_terminator.curr_iterations, ecsf.iterative_terminator.curr_iterations)
+        self.assertEqual(resumed.lengths, ecsf.lengths)
+        self.assertTrue(np.array_equal(resumed.curr_curve, ecsf.curr_curve))
+
+    def test_step_controller_records_step_of_every_iteration(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        step_controller = DisplacementECSFStepController()
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, step_controller=step_controller)
+
+        ecsf.run()
+
+        self.assertEqual(len(step_controller.step_sizes), ecsf.iterative_terminator.curr_iterations)
+        self.assertTrue(ecsf.conditional_terminator.is_finished())
+
+    def test_uniformity_resampler_skips_resamples(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        resampler = UniformityECSFResampler()
+        ecsf = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, resampler=resampler)
+
+        ecsf.run()
+
+        self.assertEqual(resampler.resample_count + resampler.skip_count, ecsf.iterative_terminator.curr_iterations)
+        self.assertGreater(resampler.skip_count, 0)
+        self.assertTrue(ecsf.conditional_terminator.is_finished())
+
+    def test_uniformity_resampler_resumes_on_checkpoint_curve(self):
+        test_input_curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        interrupted = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=10,
+                                             checkpoint_interval=30, resampler=UniformityECSFResampler())
+        for saved in interrupted.iter_run():
+            if saved.iteration == 70:
+                break
+        checkpoint = interrupted.checkpoint
+        # A uniformly spaced curve, unlike the initial curve, needs no resample.
+        checkpoint.curve = _utils.resample(checkpoint.curve, interrupted.resampling_factor)
+
+        resampler = UniformityECSFResampler()
+        resumed = ConcaveEnclosedCSFList(test_input_curve, refresh_interval=1000, save_interval=10,
+                                         resampler=resampler)
+        next(resumed.iter_run(checkpoint))
+
+        # The first decision is made on the curve of the checkpoint.
+        self.assertTrue(np.array_equal(resumed.curr_curve, checkpoint.curve))
+        self.assertFalse(resampler.is_time_to_resample())
+
+        # The counts cover the steps after the checkpoint.
+        resumed.run(checkpoint)
+        self.assertEqual(resampler.resample_count + resampler.skip_count,
+                         resumed.iterative_terminator.curr_iterations - checkpoint.iteration)
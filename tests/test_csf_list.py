@@ -0,0 +1,33 @@
+import os
+import numpy as np
+
+from unittest import TestCase
+
+from _csf_list import CSFList
+
+
+class TestCSFList(TestCase):
+    test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
+    test_file_curve = os.path.join(test_dir, "heart_curve.npy")
+
+    def test_mm_subset_batched_matches_separate_filters(self):
+        csf_list = CSFList(np.load(self.test_file_curve))
+
+        batched = csf_list.mm_subset(20)
+        separate = csf_list.mm_subset(20, batched=False)
+
+        self.assertEqual(len(batched), len(separate))
+        for curve_batched, curve_separate in zip(batched, separate):
+            self.assertTrue(np.allclose(curve_batched, curve_separate, rtol=0, atol=1e-9))
+
+    def test_mm_subset_first_curve_is_initial_curve(self):
+        test_input = np.load(self.test_file_curve)
+
+        self.assertTrue(np.array_equal(CSFList(test_input).mm_subset(5)[0], test_input))
+
+    def test_mm_subset_stacked(self):
+        test_input = np.load(self.test_file_curve)
+        csf_list = CSFList(test_input)
+
+        self.assertEqual(csf_list.mm_subset(5, stacked=True).shape, (5,) + test_input.shape)
+        self.assertEqual(csf_list.mm_subset(5, batched=False, stacked=True).shape, (5,) + test_input.shape)
@@ -0,0 +1,80 @@
+import os
+import pickle
+import subprocess
+import sys
+import numpy as np
+
+from unittest import TestCase
+
+import _curve_array
+
+
+class TestCurveArray(TestCase):
+    curves = [np.array([[0, 0], [0, 1], [1, 1], [1, 0]], dtype=float),
+              np.array([[0, 0], [0, 2], [2, 0]], dtype=float),
+              np.array([[5, 5], [5, 6], [6, 6], [7, 6], [6, 5]], dtype=float)]
+
+    def test_from_curves_round_trip(self):
+        curve_array = _curve_array.from_curves(self.curves)
+
+        self.assertEqual(len(curve_array), 3)
+        self.assertTrue(np.array_equal(curve_array.offsets, [0, 4, 7, 12]))
+        for curve, output in zip(curve_array, self.curves):
+            self.assertTrue(np.array_equal(curve, output))
+
+    def test_getitem_returns_view(self):
+        curve_array = _curve_array.from_curves(self.curves)
+
+        self.assertTrue(np.shares_memory(curve_array[1], curve_array.vertices))
+        self.assertTrue(np.array_equal(curve_array[-1], self.curves[-1]))
+
+    def test_getitem_out_of_range(self):
+        with self.assertRaises(IndexError):
+            _curve_array.from_curves(self.curves)[3]
+
+    def test_slice(self):
+        curve_array = _curve_array.from_curves(self.curves)[1:]
+
+        self.assertEqual(len(curve_array), 2)
+        self.assertTrue(np.array_equal(curve_array.offsets, [0, 3, 8]))
+        self.assertTrue(np.array_equal(curve_array[0], self.curves[1]))
+
+    def test_from_stacked_does_not_copy(self):
+        stacked = np.random.random((4, 10, 2))
+
+        curve_array = _curve_array.from_stacked(stacked)
+
+        self.assertTrue(np.shares_memory(curve_array.vertices, stacked))
+        self.assertTrue(np.array_equal(curve_array[2], stacked[2]))
+
+    def test_pickle(self):
+        curve_array = pickle.loads(pickle.dumps(_curve_array.from_curves(self.curves)))
+
+        self.assertTrue(np.array_equal(curve_array.vertex_counts(), [4, 3, 5]))
+        self.assertTrue(np.array_equal(curve_array[2], self.curves[2]))
+
+    def test_invalid_offsets(self):
+        with self.assertRaises(ValueError):
+            _curve_array.CurveArray(np.zeros((4, 2)), np.array([0, 3]))
+
+    def test_shared_memory_round_trip(self):
+        name, offsets = _curve_array.to_shared_memory(_curve_array.from_curves(self.curves))
+
+        curve_array = _curve_array.from_shared_memory(name, offsets)
+
+        self.assertTrue(np.array_equal(curve_array.vertex_counts(), [4, 3, 5]))
+        self.assertTrue(np.array_equal(curve_array[1], self.curves[1]))
+        with self.assertRaises(FileNotFoundError):
+            _curve_array.from_shared_memory(name, offsets)
+
+    def test_shared_memory_outlives_writing_process(self):
+        # The resource tracker of the writing process unlinks the blocks it tracks when the process exits.
+
+        code = ("import numpy as np, _curve_array; "
+                "print(_curve_array.to_shared_memory(_curve_array.from_curves([np.ones((3, 2))]))[0])")
+        name = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                              cwd=os.path.join(os.path.dirname(__file__), os.pardir)).stdout.strip()
+
+        curve_array = _curve_array.from_shared_memory(name, np.array([0, 3]))
+
+        self.assertTrue(np.array_equal(curve_array[0], np.ones((3, 2))))
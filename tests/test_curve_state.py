@@ -0,0 +1,87 @@
+import sys
+
+import numpy as np
+
+from unittest import TestCase, mock
+
+import _curve_kernels
+import _curve_state
+import _metrics
+import _vector_maths
+
+
+class Test(TestCase):
+    test_input = np.array([[0, 0], [0, 1/2], [0, 1], [1/2, 1], [1, 1], [1, 3/2],
+                           [1, 2], [3/2, 2], [2, 2], [2, 1], [2, 0], [1, 0]])
+
+    def test_edge_lengths_match_vector_maths(self):
+        state = _curve_state.CurveState(self.test_input)
+
+        self.assertTrue(np.allclose(state.edge_lengths, _vector_maths.edge_length(self.test_input)))
+
+    def test_tangent_normal_and_inward_normal_match_vector_maths(self):
+        state = _curve_state.CurveState(self.test_input)
+
+        self.assertTrue(np.allclose(state.tangent, _vector_maths.tangent(self.test_input)))
+        self.assertTrue(np.allclose(state.normal, _vector_maths.normal(self.test_input)))
+        self.assertTrue(np.allclose(state.inward_normal, _vector_maths.inward_normal(self.test_input)))
+
+    def test_curvature_metrics_match_metrics(self):
+        state = _curve_state.CurveState(self.test_input)
+
+        self.assertTrue(np.allclose(state.curvature, _metrics.curvature(self.test_input)))
+        self.assertTrue(np.allclose(state.normalised_curvature_positive_l1(),
+                                    _metrics.normalised_curvature_positive_l1(self.test_input)))
+        self.assertTrue(np.isclose(state.concavity, _metrics.concavity(self.test_input)))
+        self.assertTrue(np.isclose(state.total_length, _metrics.total_edge_length(self.test_input)))
+
+    def test_repeated_vertex_matches_metrics(self):
+        test_input = np.array([[0, 0], [0, 1], [0, 1], [1, 1], [1, 0]])
+
+        state = _curve_state.CurveState(test_input)
+
+        self.assertTrue(np.isfinite(state.tangent).all())
+        self.assertTrue(np.allclose(state.curvature, _metrics.curvature(test_input), equal_nan=True))
+
+    def test_backends_match(self):
+        for test_input in [self.test_input, np.array([[0, 0], [0, 1], [0, 1], [1, 1], [1, 0]])]:
+            numpy_state = _curve_state.CurveState(test_input, backend='numpy')
+            numba_state = _curve_state.CurveState(test_input, backend='numba')
+
+            for name in ['edge_lengths', 'tangent', 'normal', 'inward_normal', 'curvature']:
+                self.assertTrue(np.allclose(getattr(numba_state, name), getattr(numpy_state, name), equal_nan=True))
+            self.assertTrue(np.isclose(numba_state.concavity, numpy_state.concavity))
+            self.assertTrue(np.isclose(numba_state.total_length, numpy_state.total_length))
+
+    def test_kernel_matches_numpy_backend(self):
+        # Runs compiled if Numba is installed, and as plain Python otherwise.
+        n = self.test_input.shape[0]
+        outputs = [np.empty((n, 2)), np.empty(n), np.empty((n, 2)), np.empty((n, 2)), np.empty((n, 2)), np.empty(n)]
+
+        total_length, concavity = _curve_kernels.curve_geometry(self.test_input.astype(float), *outputs)
+
+        state = _curve_state.CurveState(self.test_input, backend='numpy')
+        for output, name in zip(outputs[1:], ['edge_lengths', 'tangent', 'normal', 'inward_normal', 'curvature']):
+            self.assertTrue(np.allclose(output, getattr(state, name)))
+        self.assertTrue(np.isclose(concavity, state.concavity))
+        self.assertTrue(np.isclose(total_length, state.total_length))
+
+    def test_set_backend(self):
+        backend = _curve_state.BACKEND
+        try:
+            _curve_state.set_backend('numpy')
+            self.assertEqual(_curve_state.BACKEND, 'numpy')
+            self.assertRaises(ValueError, _curve_state.set_backend, 'fortran')
+        finally:
+            _curve_state.BACKEND = backend
+
+    def test_kernel_falls_back_to_python_when_numba_fails_to_import(self):
+        with mock.patch.object(_curve_kernels, 'NUMBA_AVAILABLE', True), \
+                mock.patch.object(_curve_state, 'BACKEND', 'numba'), \
+                mock.patch.dict(sys.modules, {'numba': None}):
+            kernel = _curve_kernels._jit(lambda x: x + 1)
+
+            with self.assertWarns(UserWarning):
+                self.assertEqual(kernel(1), 2)
+            self.assertFalse(_curve_kernels.NUMBA_AVAILABLE)
+            self.assertEqual(_curve_state.BACKEND, 'numpy')
@@ -0,0 +1,168 @@
+import glob
+import os
+import time
+from unittest import TestCase, mock, skipUnless
+
+import numpy as np
+
+import enclosed_csf_list
+
+test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
+silhouette_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "silhouettes")
+
+
+def _shared_memory_blocks():
+    return set(glob.glob('/dev/shm/psm_*'))
+
+
+def _wait_for_shared_memory_blocks(blocks, timeout: float = 60):
+    # Running chunks release their shared memory after close() has returned.
+
+    deadline = time.time() + timeout
+    while _shared_memory_blocks() != blocks and time.time() < deadline:
+        time.sleep(0.1)
+
+    return _shared_memory_blocks()
+
+
+class TestEnclosedCSFListParallel(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        heart = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        cls.curves = [heart, heart[::2], heart[::3]]
+        cls.serial = [enclosed_csf_list.enclosed_csf_list(curve, 5) for curve in cls.curves]
+
+    def assertSameCurves(self, ecsf_list, expected):
+        self.assertEqual(len(ecsf_list), len(expected))
+        for curve, expected_curve in zip(ecsf_list, expected):
+            self.assertTrue(np.allclose(curve, expected_curve))
+
+    def test_ordered_results_match_serial(self):
+        results = list(enclosed_csf_list.enclosed_csf_list_parallel(self.curves, 5, max_workers=2))
+
+        self.assertEqual([index for index, _ in results], [0, 1, 2])
+        for (_, ecsf_list), expected in zip(results, self.serial):
+            self.assertSameCurves(ecsf_list, expected)
+
+    def test_completed_results_match_serial(self):
+        results = dict(enclosed_csf_list.enclosed_csf_list_parallel(self.curves, 5, max_workers=2, chunksize=2,
+                                                                    ordered=False, shared_memory=False))
+
+        self.assertEqual(sorted(results), [0, 1, 2])
+        for index, expected in enumerate(self.serial):
+            self.assertSameCurves(results[index], expected)
+
+    def test_compact_results(self):
+        results = list(enclosed_csf_list.enclosed_csf_list_parallel(self.curves[1:], 5, max_workers=2, compact=True))
+
+        for (_, ecsf_array), expected in zip(results, self.serial[1:]):
+            self.assertSameCurves(ecsf_array.to_list(), expected)
+
+    def test_path_input_and_error_returned_in_place_of_result(self):
+        path = os.path.join(silhouette_dir, "other", "heart.bmp")
+        missing_path = os.path.join(silhouette_dir, "missing.png")
+
+        results = dict(enclosed_csf_list.enclosed_csf_list_parallel([path, missing_path, self.curves[2]], 5,
+                                                                    max_workers=2))
+
+        self.assertSameCurves(results[0], enclosed_csf_list.enclosed_csf_list(enclosed_csf_list._load_curve(path), 5))
+        self.assertIsInstance(results[1], Exception)
+        self.assertSameCurves(results[2], self.serial[2])
+
+    @skipUnless(os.path.isdir('/dev/shm'), "Shared memory blocks are listed in /dev/shm")
+    def test_shared_memory_released_when_closed_early(self):
+        blocks = _shared_memory_blocks()
+
+        results = enclosed_csf_list.enclosed_csf_list_parallel(self.curves * 2, 5, max_workers=2, ordered=False)
+        next(results)
+        results.close()
+
+        self.assertEqual(_wait_for_shared_memory_blocks(blocks), blocks)
+
+    @skipUnless(os.path.isdir('/dev/shm'), "Shared memory blocks are listed in /dev/shm")
+    def test_shared_memory_released_when_collected(self):
+        blocks = _shared_memory_blocks()
+
+        list(enclosed_csf_list.enclosed_csf_list_parallel(self.curves, 5, max_workers=2))
+
+        self.assertEqual(_shared_memory_blocks(), blocks)
+
+
+class TestEnclosedCSFListRetryOnFail(TestCase):
+    def test_time_limit_reached_raises_timeout(self):
+        curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+
+        for rewind in [False, True]:
+            with self.assertRaises(TimeoutError):
+                enclosed_csf_list.enclosed_csf_list_retry_on_fail(curve, 10, max_seconds=0, rewind=rewind)
+
+
+class TestSpeculativeEnclosedCSFList(TestCase):
+    def test_largest_successful_step_size_wins_and_smaller_are_cancelled(self):
+        cancelled = {}
+
+        def run(curve, n_subsets, step_size, compact, cancel_event=None, **kwargs):
+            if step_size > 0.5:
+                raise Exception("Intersection in subset curve, try a smaller step size.")
+            if step_size < 0.1:
+                # Smaller step sizes run until cancelled.
+                cancelled[step_size] = cancel_event.wait(10)
+            return step_size
+
+        with mock.patch.object(enclosed_csf_list, 'enclosed_csf_list', run):
+            result = enclosed_csf_list._speculative_enclosed_csf_list(None, 5, [1, 0.2, 0.04, 0.008], False, 100,
+                                                                      'thread')
+
+        self.assertEqual(result, 0.2)
+        self.assertEqual(cancelled, {0.04: True, 0.008: True})
+
+    def test_fails_when_every_step_size_fails(self):
+        def run(curve, n_subsets, step_size, compact, cancel_event=None, **kwargs):
+            raise Exception("Intersection in subset curve, try a smaller step size.")
+
+        with mock.patch.object(enclosed_csf_list, 'enclosed_csf_list', run):
+            with self.assertRaises(Exception):
+                enclosed_csf_list._speculative_enclosed_csf_list(None, 5, [1, 0.2], False, 100, 'thread')
+
+    def test_matches_serial_retry(self):
+        curve = np.load(os.path.join(test_dir, "heart_curve.npy"))[::2]
+        expected = enclosed_csf_list.enclosed_csf_list_retry_on_fail(curve, 5)
+
+        for speculative in ['thread', 'process']:
+            ecsf_list = enclosed_csf_list.enclosed_csf_list_retry_on_fail(curve, 5, speculative=speculative)
+
+            self.assertEqual(len(ecsf_list), len(expected))
+            for ecsf_curve, expected_curve in zip(ecsf_list, expected):
+                self.assertTrue(np.allclose(ecsf_curve, expected_curve))
+
+
+class TestRewindingEnclosedCSFList(TestCase):
+    def test_failed_run_rewinds_to_checkpoint_with_smaller_step_size(self):
+        curve = np.load(os.path.join(test_dir, "heart_curve.npy"))
+        runs = []
+
+        class IntersectingOnce(enclosed_csf_list._concave_enclosed_csf_list.ConcaveEnclosedCSFList):
+            # The first run forms a loop once it has a good checkpoint; later runs record where they resume.
+
+            def run(self, checkpoint=None):
+                runs.append({'step_size': self.step_size, 'checkpoint': checkpoint})
+                super().run(checkpoint)
+
+            def _step(self):
+                if 'resumed_at' not in runs[-1]:
+                    runs[-1]['resumed_at'] = self.iterative_terminator.curr_iterations
+                super()._step()
+                if len(runs) == 1 and self.checkpoint is not None and self.checkpoint.iteration > 0:
+                    self.intersecting_curve_flag = True
+
+        with mock.patch.object(enclosed_csf_list._concave_enclosed_csf_list, 'ConcaveEnclosedCSFList',
+                               IntersectingOnce):
+            ecsf_list = enclosed_csf_list._rewinding_enclosed_csf_list(curve, 5, 0.2, False, None, None)
+
+        self.assertEqual(len(runs), 2)
+        self.assertEqual([run['step_size'] for run in runs], [0.2, 0.2 / 5])
+        self.assertIsNone(runs[0]['checkpoint'])
+        self.assertEqual(runs[1]['checkpoint'].iteration, 100)
+        self.assertEqual(runs[1]['resumed_at'], 100)
+        self.assertEqual(len(ecsf_list), 5)
+        self.assertTrue(np.allclose(ecsf_list[0], curve))
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+HEAVY_MODULES = ['cv2', 'numba', 'PIL', 'scipy', 'skgeom', 'skimage']
+
+
+def _heavy_modules_imported_by(statement: str):
+    # The heavy modules loaded by the import statement in a fresh interpreter.
+
+    code = (f"{statement}\n"
+            "import sys\n"
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n")
+    output = subprocess.run([sys.executable, '-c', code], cwd=package_dir, capture_output=True, text=True,
+                            check=True).stdout
+
+    return output.split()
+
+
+class TestImportTime(TestCase):
+    def test_enclosed_csf_list_imports_no_heavy_modules(self):
+        self.assertEqual(_heavy_modules_imported_by("import enclosed_csf_list"), [])
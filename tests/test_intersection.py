@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+import numpy as np
+
+import _intersection
+
+
+def _brute_force_self_intersections(curve: np.ndarray):
+    n = curve.shape[0]
+    start, end = curve, np.roll(curve, -1, axis=0)
+    pairs = [(i, j) for i in range(n) for j in range(i + 2, n) if j - i != n - 1]
+
+    return {(i, j) for i, j in pairs
+            if _intersection._edges_cross(start[[i]], end[[i]], start[[j]], end[[j]])[0]}
+
+
+class TestIntersection(TestCase):
+    def test_self_intersections_circle(self):
+        t = np.linspace(0, 2*np.pi, 200, endpoint=False)
+        circle = np.column_stack((np.cos(t), np.sin(t)))
+
+        self.assertEqual(_intersection.self_intersections(circle).shape, (0, 2))
+
+    def test_self_intersections_figure_eight(self):
+        t = np.linspace(0, 2*np.pi, 500, endpoint=False)
+        figure_eight = np.column_stack((100 * np.sin(t), 50 * np.sin(2 * t)))
+
+        pairs = _intersection.self_intersections(figure_eight)
+
+        self.assertEqual(pairs.tolist(), [[250, 499]])
+        self.assertTrue(np.allclose(_intersection.crossing_points(figure_eight, pairs), [[0, 0]]))
+
+    def test_self_intersections_matches_brute_force(self):
+        curve = np.random.default_rng(0).random((60, 2)) * 100
+
+        pairs = _intersection.self_intersections(curve)
+
+        self.assertEqual({tuple(pair) for pair in pairs.tolist()}, _brute_force_self_intersections(curve))
+
+    def test_self_intersections_only_tests_moved_edges(self):
+        curve = np.random.default_rng(0).random((60, 2)) * 100
+        moved = np.zeros(60, dtype=bool)
+        moved[10] = True
+
+        pairs = _intersection.self_intersections(curve, moved)
+
+        self.assertEqual({tuple(pair) for pair in pairs.tolist()},
+                         {pair for pair in _brute_force_self_intersections(curve) if 10 in pair})
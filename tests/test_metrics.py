@@ -1,7 +1,8 @@
+import importlib.util
 import os
 import numpy as np
 
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 
 import _metrics
 import _vector_maths
@@ -52,3 +53,17 @@ class Test(TestCase):
         output = 100 * 20 * np.pi
 
         self.assertTrue(np.isclose(_metrics.enclosed_area(test_input), output))
+
+    def test_signed_area_orientation(self):
+        test_input = np.array([[0, 0], [0, 1], [1, 1], [1, 0]])
+
+        self.assertEqual(_metrics.signed_area(test_input), -1)
+        self.assertEqual(_metrics.signed_area(test_input[::-1]), 1)
+        self.assertTrue(_metrics.is_clockwise(test_input))
+        self.assertFalse(_metrics.is_clockwise(test_input[::-1]))
+
+    @skipUnless(importlib.util.find_spec('skgeom'), "scikit-geometry computes the exact area")
+    def test_area_matches_exact_area(self):
+        test_input = np.array([[0, 0], [0, 3], [1, 1], [3, 2], [2, 0.5]])
+
+        self.assertTrue(np.isclose(_metrics.enclosed_area(test_input), _metrics.enclosed_area(test_input, exact=True)))
@@ -0,0 +1,69 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+
+import _metrics
+import _resampler_classes
+from _multi_resolution_concave_enclosed_csf_list import MultiResolutionConcaveEnclosedCSFList
+
+test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
+
+
+class TestMultiResolutionConcaveEnclosedCSFList(TestCase):
+    def setUp(self):
+        self.curve = np.load(os.path.join(test_dir, "heart_curve.npy")).astype(float)
+
+    def test_flow_runs_on_decimated_curve(self):
+        ecsf = MultiResolutionConcaveEnclosedCSFList(self.curve, coarsening=2, refresh_interval=1000)
+
+        ecsf.run()
+
+        self.assertEqual(ecsf.coarsening, 2)
+        self.assertLess(ecsf.curr_curve.shape[0], 0.6 * ecsf.fine_resampling_factor * ecsf.curr_state.total_length)
+        self.assertLessEqual(ecsf.area_errors[0], ecsf.max_area_error)
+        self.assertTrue(ecsf.conditional_terminator.is_finished())
+
+    def test_saved_curves_have_initial_vertex_spacing(self):
+        ecsf = MultiResolutionConcaveEnclosedCSFList(self.curve, coarsening=2, refresh_interval=1000)
+
+        ecsf.run()
+
+        for curve in ecsf.curves:
+            vertex_count = ecsf.fine_resampling_factor * _metrics.total_edge_length(curve)
+            self.assertAlmostEqual(curve.shape[0] / vertex_count, 1, delta=0.01)
+
+    def test_coarsening_reduced_to_bound_area_error(self):
+        ecsf = MultiResolutionConcaveEnclosedCSFList(self.curve, coarsening=8, max_area_error=-1)
+
+        self.assertEqual(ecsf.coarsening, 1)
+        self.assertEqual(ecsf.area_errors, [])
+
+    def test_refines_below_area_fraction(self):
+        ecsf = MultiResolutionConcaveEnclosedCSFList(self.curve, coarsening=2, refine_area_fraction=0.9,
+                                                     refresh_interval=1000,
+                                                     resampler=_resampler_classes.UniformityECSFResampler())
+
+        ecsf.run()
+
+        self.assertEqual(ecsf.coarsening, 1)
+        self.assertEqual(len(ecsf.area_errors), 2)
+        self.assertEqual(ecsf.resampling_factor, ecsf.fine_resampling_factor)
+        self.assertEqual(ecsf.resampler.resampling_factor, ecsf.fine_resampling_factor)
+        self.assertLess(ecsf.last_to_first_curve_area_ratio(), 0.9)
+
+    def test_resumes_at_resolution_of_checkpoint(self):
+        kwargs = dict(coarsening=2, refine_area_fraction=0.9, refresh_interval=1000, step_size=0.2,
+                      resampler=_resampler_classes.UniformityECSFResampler())
+        ecsf = MultiResolutionConcaveEnclosedCSFList(self.curve, checkpoint_interval=50, **kwargs)
+        ecsf.run()
+        checkpoint = ecsf.checkpoint
+
+        resumed = MultiResolutionConcaveEnclosedCSFList(self.curve, **kwargs)
+        next(resumed.iter_run(checkpoint))
+
+        # The checkpoint was taken after refinement, so the flow resumes at full resolution.
+        self.assertEqual(checkpoint.resampling_factor, ecsf.fine_resampling_factor)
+        self.assertEqual(resumed.coarsening, 1)
+        self.assertEqual(resumed.resampling_factor, resumed.fine_resampling_factor)
+        self.assertEqual(resumed.resampler.resampling_factor, resumed.fine_resampling_factor)
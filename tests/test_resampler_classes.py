@@ -0,0 +1,94 @@
+import numpy as np
+
+from unittest import TestCase
+
+import _resampler_classes
+
+
+class _State:
+    def __init__(self, edge_lengths: np.ndarray):
+        self.edge_lengths = edge_lengths
+        self.total_length = edge_lengths.sum()
+
+
+class TestIterativeECSFResampler(TestCase):
+    def test_resamples_every_interval(self):
+        resampler = _resampler_classes.IterativeECSFResampler(3)
+        state = _State(np.ones(100))
+        resampler.start(state, 1)
+
+        is_time = []
+        for _ in range(6):
+            is_time.append(resampler.is_time_to_resample())
+            resampler.next_step(state)
+
+        self.assertEqual(is_time, [True, False, False, True, False, False])
+        self.assertEqual(resampler.resample_count, 2)
+        self.assertEqual(resampler.skip_count, 4)
+
+    def test_resume_keeps_interval_from_start_of_flow(self):
+        resampler = _resampler_classes.IterativeECSFResampler(3)
+        state = _State(np.ones(100))
+        resampler.resume(state, 1, 4)
+
+        is_time = []
+        for _ in range(3):
+            is_time.append(resampler.is_time_to_resample())
+            resampler.next_step(state)
+
+        self.assertEqual(is_time, [False, False, True])
+        self.assertEqual((resampler.resample_count, resampler.skip_count), (1, 2))
+
+
+class TestUniformityECSFResampler(TestCase):
+    def test_uniform_curve_is_not_resampled(self):
+        resampler = _resampler_classes.UniformityECSFResampler()
+        resampler.start(_State(np.ones(100)), 1)
+
+        self.assertFalse(resampler.is_time_to_resample())
+        self.assertFalse(resampler.is_time_to_resample())
+
+        resampler.next_step(_State(np.ones(100)))
+
+        self.assertEqual((resampler.resample_count, resampler.skip_count), (0, 1))
+
+    def test_short_edge_is_resampled(self):
+        resampler = _resampler_classes.UniformityECSFResampler(min_edge_ratio=0.5, max_variation=np.inf,
+                                                                 max_density_change=np.inf)
+        edge_lengths = np.ones(100)
+        edge_lengths[10] = 0.4
+        resampler.start(_State(np.ones(100)), 1)
+
+        resampler.next_step(_State(edge_lengths))
+
+        self.assertTrue(resampler.is_time_to_resample())
+
+        resampler.next_step(_State(np.ones(100)))
+
+        self.assertFalse(resampler.is_time_to_resample())
+        self.assertEqual((resampler.resample_count, resampler.skip_count), (1, 1))
+
+    def test_long_edge_is_resampled(self):
+        resampler = _resampler_classes.UniformityECSFResampler(max_edge_ratio=1.5, max_variation=np.inf,
+                                                                 max_density_change=np.inf)
+        edge_lengths = np.ones(100)
+        edge_lengths[10] = 2
+        resampler.start(_State(edge_lengths), 1)
+
+        self.assertTrue(resampler.is_time_to_resample())
+
+    def test_varied_edges_are_resampled(self):
+        resampler = _resampler_classes.UniformityECSFResampler(min_edge_ratio=0, max_edge_ratio=np.inf,
+                                                                 max_variation=0.1, max_density_change=np.inf)
+        resampler.start(_State(np.tile([0.8, 1.2], 50)), 1)
+
+        self.assertTrue(resampler.is_time_to_resample())
+
+    def test_shortened_curve_is_resampled(self):
+        resampler = _resampler_classes.UniformityECSFResampler(max_density_change=0.01)
+        resampler.start(_State(np.ones(100)), 1)
+
+        # The same vertices on a curve 2% shorter are 2 more than resampling would give.
+        resampler.next_step(_State(np.full(100, 0.98)))
+
+        self.assertTrue(resampler.is_time_to_resample())
@@ -0,0 +1,87 @@
+import numpy as np
+
+from unittest import TestCase
+
+import _saver_classes
+
+
+class _State:
+    def __init__(self, area: float):
+        self.curve = np.full((4, 2), area)
+        self.total_length = area
+        self.concavity = 0
+        self._area = area
+
+    def enclosed_area(self):
+        return self._area
+
+
+class TestIterativeECSFSaver(TestCase):
+    def test_saves_copy_of_current_curve_every_interval(self):
+        saver = _saver_classes.IterativeECSFSaver(2)
+        state = _State(100)
+        saved_curves = []
+
+        # The curve of the state is overwritten at each step, as in the flow's workspace.
+        saver.start(state)
+        for area in [95, 90, 85, 80]:
+            if saver.is_time_to_save():
+                saved_curves += saver.saved_curves(state)
+            state.curve[:] = area
+            state._area = area
+            saver.next_step(state)
+
+        self.assertEqual([(saved.iteration, saved.area) for saved in saved_curves], [(0, 100), (2, 90)])
+        self.assertTrue(np.all(saved_curves[1].curve == 90))
+
+
+class TestAreaECSFSaver(TestCase):
+    def test_saves_nearest_iterate_to_each_target(self):
+        saver = _saver_classes.AreaECSFSaver([100, 80, 60])
+        saved_curves = []
+
+        state = _State(100)
+        saver.start(state)
+        saved_curves += saver.saved_curves(state)
+        for area in [95, 85, 79, 70, 62, 50]:
+            state = _State(area)
+            saver.next_step(state)
+            saved_curves += saver.saved_curves(state)
+
+        self.assertEqual([saved.area for saved in saved_curves], [100, 79, 62])
+        self.assertEqual([saved.iteration for saved in saved_curves], [0, 3, 5])
+
+    def test_saves_every_target_passed_in_one_step(self):
+        saver = _saver_classes.AreaECSFSaver([90, 80, 70])
+
+        state = _State(65)
+        saver.start(_State(100))
+        saver.next_step(state)
+
+        self.assertTrue(saver.is_time_to_save())
+        self.assertEqual(len(saver.saved_curves(state)), 3)
+        self.assertFalse(saver.is_time_to_save())
+
+    def test_target_passed_right_after_resume_has_checkpoint_iteration(self):
+        saver = _saver_classes.AreaECSFSaver([90, 80])
+
+        # One curve was saved before the checkpoint, taken at iteration 40.
+        saver.resume(_State(75), 40, 1)
+        saved_curves = saver.saved_curves(_State(75))
+        saver.next_step(_State(70))
+
+        self.assertEqual([(saved.iteration, saved.area) for saved in saved_curves], [(40, 75)])
+        self.assertFalse(saver.is_time_to_save())
+        self.assertEqual(saver.curr_iteration, 41)
+
+    def test_saved_curve_is_not_overwritten(self):
+        saver = _saver_classes.AreaECSFSaver([90])
+
+        state = _State(89)
+        saver.start(_State(100))
+        saver.next_step(state)
+        saved = saver.saved_curves(state)[0]
+        saver.next_step(_State(70))
+        saver.next_step(_State(60))
+
+        self.assertTrue(np.all(saved.curve == 89))
@@ -0,0 +1,85 @@
+import timeit
+from unittest import TestCase
+
+import numpy as np
+
+import _scaling_functions
+
+
+class TestTabulated(TestCase):
+    def setUp(self):
+        self.x = np.linspace(-1, 1, 1001)
+
+    def test_within_max_error(self):
+        for function in [_scaling_functions.f_sigmoid(10, 0.1),
+                         _scaling_functions.f_elu(1, -0.1),
+                         _scaling_functions.f_softplus(1, 0.1)]:
+            tabulated = _scaling_functions.f_tabulated(function, max_error=1e-3)
+
+            self.assertLessEqual(np.max(np.abs(tabulated(self.x) - function(self.x))), 1e-3)
+
+    def test_within_tight_max_error(self):
+        function = _scaling_functions.f_sigmoid(10, 0.1)
+        x = np.linspace(-1, 1, 100003)
+
+        tabulated = _scaling_functions.f_tabulated(function, max_error=1e-10)
+
+        self.assertLessEqual(np.max(np.abs(tabulated(x) - function(x))), 1e-10)
+
+    def test_unreachable_max_error_raises(self):
+        with self.assertRaises(ValueError):
+            _scaling_functions.f_tabulated(_scaling_functions.f_sigmoid(10, 0.1), max_error=1e-15)
+
+    def test_resolution_gives_table_size(self):
+        function = _scaling_functions.f_elu(1, -0.1)
+        tabulated = _scaling_functions.f_tabulated(function, resolution=3)
+        table = function(np.array([-1., 0., 1.]))
+
+        self.assertTrue(np.allclose(tabulated(np.array([-1, -0.5, 0.5, 1])),
+                                    [table[0], (table[0] + table[1]) / 2, (table[1] + table[2]) / 2, table[2]],
+                                    rtol=0, atol=1e-15))
+        self.assertRaises(ValueError, _scaling_functions.f_tabulated, function, resolution=1)
+
+    def test_writes_into_out(self):
+        function = _scaling_functions.f_sigmoid(10, 0.1)
+        tabulated = _scaling_functions.f_tabulated(function)
+        out = np.empty_like(self.x)
+
+        result = tabulated(self.x, out)
+
+        self.assertIs(result, out)
+        self.assertTrue(np.allclose(out, function(self.x), atol=1e-4))
+
+    def test_evaluates_inputs_outside_table(self):
+        function = _scaling_functions.f_softplus(1, 0.1)
+        tabulated = _scaling_functions.f_tabulated(function)
+        x = np.array([-3, 0, 2, np.nan])
+
+        result = tabulated(x)
+
+        self.assertEqual(result[0], function(x[:1])[0])
+        self.assertEqual(result[2], function(x[2:3])[0])
+        self.assertTrue(np.isnan(result[3]))
+
+    def test_clip_takes_table_ends(self):
+        function = _scaling_functions.f_sigmoid(10, 0.1)
+        tabulated = _scaling_functions.f_tabulated(function, clip=True)
+
+        self.assertTrue(np.allclose(tabulated(np.array([-3., 2.])), function(np.array([-3., 2.])), rtol=0, atol=1e-15))
+
+    def test_faster_than_costly_function(self):
+        # A lookup costs a few array operations, whatever the function, so the table pays off for functions that cost
+        # more, here twenty exponentials per vertex.
+
+        def function(x):
+            return sum(np.exp(-k * x * x) for k in range(1, 21)) / 20
+
+        tabulated = _scaling_functions.f_tabulated(function, max_error=1e-8)
+        x = np.random.default_rng(0).uniform(-1, 1, 3000)
+        out = np.empty_like(x)
+
+        function_seconds = min(timeit.repeat(lambda: function(x), number=20, repeat=5))
+        tabulated_seconds = min(timeit.repeat(lambda: tabulated(x, out), number=20, repeat=5))
+
+        self.assertLessEqual(np.max(np.abs(out - function(x))), 1e-8)
+        self.assertLess(tabulated_seconds, function_seconds / 2)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from unittest import TestCase
+
+import _step_controller_classes
+
+
+class _State:
+    def __init__(self, n: int, total_length: float, curvature: np.ndarray):
+        self.curve = np.zeros((n, 2))
+        self.total_length = total_length
+        self.curvature = curvature
+
+
+class TestDisplacementECSFStepController(TestCase):
+    def setUp(self):
+        self.unit_step_vector = np.zeros((10, 2))
+        self.unit_step_vector[:, 0] = np.linspace(0, 0.5, 10)
+
+    def test_step_bounded_by_edge_length(self):
+        controller = _step_controller_classes.DisplacementECSFStepController(max_edge_fraction=0.25,
+                                                                             max_curvature_fraction=np.inf)
+        controller.start()
+
+        step_size = controller.next_step(_State(10, 20, np.zeros(10)), self.unit_step_vector)
+
+        # Mean edge length 2, largest displacement 0.5 at unit step size.
+        self.assertAlmostEqual(step_size, 0.25 * 2 / 0.5)
+
+    def test_step_bounded_by_curvature(self):
+        controller = _step_controller_classes.DisplacementECSFStepController(max_edge_fraction=np.inf,
+                                                                             max_curvature_fraction=0.1)
+        controller.start()
+        curvature = np.full(10, -5.)
+        curvature[4] = 2
+
+        step_size = controller.next_step(_State(10, 20, curvature), self.unit_step_vector)
+
+        # Only the convex vertex counts, moving 4/9 * 0.5 at unit step size with radius of curvature 0.5.
+        self.assertAlmostEqual(step_size, 0.1 / (4 / 9 * 0.5 * 2))
+
+    def test_step_growth_is_limited_and_recorded(self):
+        controller = _step_controller_classes.DisplacementECSFStepController(max_edge_fraction=0.25, growth=1.5)
+        controller.start()
+
+        step_sizes = [controller.next_step(_State(10, length, np.zeros(10)), self.unit_step_vector)
+                      for length in [2, 20, 20]]
+
+        self.assertEqual(controller.step_sizes, step_sizes)
+        self.assertAlmostEqual(step_sizes[1], 1.5 * step_sizes[0])
+        self.assertAlmostEqual(step_sizes[2], 1.5 * step_sizes[1])
+
+    def test_step_clamped_to_minimum(self):
+        controller = _step_controller_classes.DisplacementECSFStepController(min_step_size=0.1)
+        controller.start()
+
+        step_size = controller.next_step(_State(10, 0.01, np.zeros(10)), self.unit_step_vector)
+
+        self.assertEqual(step_size, 0.1)
@@ -0,0 +1,114 @@
+import os
+import numpy as np
+
+from unittest import TestCase
+
+import _utils
+
+
+class Test(TestCase):
+    test_dir = os.path.join(os.path.dirname(__file__), os.pardir, "lib", "test_data")
+    test_file_curve = os.path.join(test_dir, "heart_curve.npy")
+
+    def test_resample_factor_equals_0(self):
+        test_input = np.load(self.test_file_curve)
+
+        self.assertTrue(len(_utils.resample(test_input, 0)) == 0)
+
+    def test_resample_returns_test_input_with_no_change(self):
+        test_input = np.array([[0, 0], [0, 2], [2, 2], [2, 0]])
+        factor = 4 / 8
+
+        self.assertTrue(np.allclose(_utils.resample(test_input, factor), test_input))
+
+    def test_resample_identical_to_interp1d(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+
+        for factor in [1 / 100, 1 / 3, 1, 2.5]:
+            self.assertTrue(np.array_equal(_utils.resample(test_input, factor),
+                                           _utils._interp1d_resample(test_input, factor)))
+
+    def test_resample_repeated_vertices(self):
+        test_input = np.array([[0, 0], [0, 2], [0, 2], [2, 2], [2, 0], [2, 0]], dtype=float)
+
+        self.assertTrue(np.array_equal(_utils.resample(test_input, 1), _utils._interp1d_resample(test_input, 1)))
+
+    def test_spectral_gaussian_filter_matches_direct(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+
+        for sigma in [0.5, 10, 200, 5000]:
+            self.assertTrue(np.allclose(_utils.gaussian_filter(test_input, sigma, method='spectral'),
+                                        _utils.gaussian_filter(test_input, sigma, method='direct')))
+
+    def test_spectral_gaussian_filter_writes_output(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+        output = np.empty_like(test_input)
+
+        result = _utils.gaussian_filter(test_input, 100, output, method='spectral')
+
+        self.assertIs(result, output)
+        self.assertTrue(np.allclose(output, _utils.gaussian_filter(test_input, 100, method='direct')))
+
+    def test_gaussian_filter_auto_uses_spectral_for_large_sigma(self):
+        self.assertFalse(_utils._is_spectral_cheaper(1, 10000))
+        self.assertTrue(_utils._is_spectral_cheaper(1000, 10000))
+
+    def test_gaussian_filter_unknown_method(self):
+        with self.assertRaises(ValueError):
+            _utils.gaussian_filter(np.zeros((4, 2)), 1, method='fourier')
+
+    def test_gaussian_transfer_functions_match_each_sigma(self):
+        sigmas = np.array([1e-300, 0.3, 1, 10, 1000])
+        n = 500
+
+        output = np.array([_utils.gaussian_transfer_function(sigma, n) for sigma in sigmas])
+
+        self.assertTrue(np.allclose(_utils.gaussian_transfer_functions(sigmas, n), output, rtol=0, atol=1e-14))
+
+    def test_untruncated_gaussian_transfer_functions_close_to_truncated_kernel(self):
+        sigmas = np.array([0.3, 1, 10, 1000])
+        n = 500
+
+        output = _utils.gaussian_transfer_functions(sigmas, n)
+
+        self.assertTrue(np.allclose(_utils.untruncated_gaussian_transfer_functions(sigmas, n), output, atol=1e-3))
+
+    def test_untruncated_gaussian_transfer_functions_narrow_sigma_matches_alias_sum(self):
+        n = 64
+        frequencies = np.arange(n // 2 + 1) / n
+
+        for sigma in [0.1, 0.3, _utils.MIN_ALIASED_SIGMA - 0.01, _utils.MIN_ALIASED_SIGMA]:
+            alias_sum = sum(np.exp(-2 * np.pi ** 2 * sigma ** 2 * (frequencies + m) ** 2) for m in range(-100, 101))
+
+            self.assertTrue(np.allclose(_utils.untruncated_gaussian_transfer_functions([sigma], n)[0],
+                                        alias_sum / alias_sum[0], rtol=0, atol=1e-12))
+
+    def test_gaussian_scale_space_tiny_sigma_returns_curve(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+
+        for truncated in [True, False]:
+            output = _utils.gaussian_scale_space(test_input, [1e-12, 1e-300, 5], truncated)
+
+            self.assertTrue(np.allclose(output[0], test_input))
+            self.assertTrue(np.allclose(output[1], test_input))
+            self.assertTrue(np.allclose(output[2], _utils.gaussian_filter(test_input, 5), atol=1e-2))
+
+    def test_gaussian_scale_space_matches_gaussian_filter(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+        sigmas = [0.3, 1, 5, 50, 5000]
+
+        output = _utils.gaussian_scale_space(test_input, sigmas)
+
+        for curve, sigma in zip(output, sigmas):
+            for method in ['direct', 'spectral']:
+                self.assertTrue(np.allclose(curve, _utils.gaussian_filter(test_input, sigma, method=method),
+                                            rtol=0, atol=1e-9))
+
+    def test_gaussian_scale_space_sigma_zero_returns_curve(self):
+        test_input = np.load(self.test_file_curve).astype(float)
+
+        output = _utils.gaussian_scale_space(test_input, [0, 5, 50])
+
+        self.assertEqual(output.shape, (3,) + test_input.shape)
+        self.assertTrue(np.array_equal(output[0], test_input))
+        self.assertTrue(np.allclose(output[2], _utils.gaussian_filter(test_input, 50), atol=1e-2))
@@ -0,0 +1,30 @@
+import numpy as np
+
+from unittest import TestCase
+
+import _vector_maths
+import _workspace
+
+
+class Test(TestCase):
+    def test_array_reuses_memory(self):
+        workspace = _workspace.ECSFWorkspace(10)
+
+        first = workspace.array('a', 10, 2)
+        second = workspace.array('a', 5, 2)
+
+        self.assertTrue(np.shares_memory(first, second))
+        self.assertEqual(second.shape, (5, 2))
+
+    def test_array_grows_past_capacity(self):
+        workspace = _workspace.ECSFWorkspace(4)
+
+        self.assertEqual(workspace.array('a', 8).shape, (8,))
+        self.assertEqual(workspace.capacity, 8)
+
+    def test_differences_match_vector_maths(self):
+        test_input = np.array([[0, 0], [0, 1], [1, 2], [2, -1]], dtype=float)
+
+        _, edge_lengths = _workspace.ECSFWorkspace().differences(test_input)
+
+        self.assertTrue(np.allclose(edge_lengths, _vector_maths.edge_length(test_input)))